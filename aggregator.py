@@ -1,57 +1,514 @@
+import os
+import sys
 import time
+import atexit
+import threading
+from contextlib import closing, nullcontext, redirect_stdout
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor, wait, FIRST_COMPLETED
 from .config import Config
 from .data import AggregatedResults
 from .scorer import TrendScorer
 from .filter import ContentFilter
-from ..scrapers.tiktok import TikTokScraper
-from ..scrapers.instagram import InstagramScraper
-from ..scrapers.reddit import RedditScraper
-from ..scrapers.youtube import YouTubeScraper
+from .store import ItemStore
+from .hashtags import HashtagIndex
+from .distributed import Coordinator, Worker, queue_from_config
+from .metrics import metrics, profiled
+from .registry import Registry
+from .writers import write_from_config
 
 
 SCRAPERS = {
-    "tiktok":    TikTokScraper,
-    "instagram": InstagramScraper,
-    "reddit":    RedditScraper,
-    "youtube":   YouTubeScraper,
+    "tiktok":    "socialradar.scrapers.tiktok:TikTokScraper",
+    "instagram": "socialradar.scrapers.instagram:InstagramScraper",
+    "reddit":    "socialradar.scrapers.reddit:RedditScraper",
+    "youtube":   "socialradar.scrapers.youtube:YouTubeScraper",
 }
 
+scrapers = Registry("socialradar.scrapers", SCRAPERS)
+
 
 class Aggregator:
-    def __init__(self, config: Config):
-        self.config  = config
-        self.scorer  = TrendScorer(weights=config.get("report.trending_score_weight"))
-        self.filter  = ContentFilter(config)
+    def __init__(self, config: Config, store: bool = True):
+        # requests and numpy load here rather than at import, so CLI paths that never scrape start fast
+        from ..scrapers.client import HttpClient
+        self.config   = config
+        self.scorer   = TrendScorer(weights=config.get("report.trending_score_weight"))
+        self.filter   = ContentFilter(config)
+        self.http     = HttpClient.from_config(config)
+        self.batch    = None
+        self.store    = ItemStore.from_config(config) if store and config.get("store.enabled", False) else None
+        self.hashtags = HashtagIndex.from_config(config) if config.get("hashtags.enabled", False) else None
+        self.queue    = queue_from_config(config) if config.get("distributed.enabled", False) else None
+        if config.get("metrics.profile", False):
+            # cProfile only follows the thread that enabled it, so while profiling everything runs on this one
+            self.http.fan_out_workers = 1
+        if config.get("report.scoring", "per_source") == "batch":
+            from .scoring import BatchScorer
+            self.batch = BatchScorer(weights=config.get("report.trending_score_weight"))
 
     def run(self, sources: list = None) -> AggregatedResults:
+        # when the stream goes to stdout it owns it, so progress lines move to stderr
+        progress = redirect_stdout(sys.stderr) if self.config.get("report.stream.path") == "-" else nullcontext()
+        with profiled(self.config), metrics.timer("cycle"):
+            with progress:
+                results = self._run(sources)
+            with metrics.timer("write"):
+                write_from_config(results, self.config)
+        if self.config.get("metrics.enabled", False):
+            results.meta["metrics"] = metrics.export(self.config)
+        return results
+
+    def _run(self, sources: list = None) -> AggregatedResults:
         results = AggregatedResults()
-        targets = sources or list(SCRAPERS.keys())
+        targets = sources or scrapers.names()
 
         print(f"\n{'='*55}")
         print(f"  SocialRadar — Trending Content Aggregator")
         print(f"{'='*55}\n")
 
+        enabled = []
         for name in targets:
             if not self.config.is_enabled(name):
                 print(f"  [{name.upper()}] skipped (disabled in config)")
                 continue
+            enabled.append(name)
+
+        shards    = [(name, region) for name in enabled for region in self._regions(name)]
+        profiling = self.config.get("metrics.profile", False)
+        if self.queue is not None and enabled:
+            self._run_distributed(shards, results)
+        elif self.config.get("aggregator.shards", "off") == "process" and len(shards) > 1 and not profiling:
+            self._run_sharded(shards, results)
+        elif self.config.get("aggregator.concurrent", False) and len(enabled) > 1 and not profiling:
+            self._run_concurrent(enabled, results)
+        else:
+            self._run_sequential(enabled, results)
+
+        if self.batch is not None and results.items:
+            with metrics.timer("score", source="all"):
+                self.batch.score_all(results.all_items())
+            results.reindex()
+
+        if self.config.get("filters.cross_source_dedupe", True) and results.items:
+            self._dedupe(results)
+
+        if self.hashtags is not None and results.items:
+            self._track_hashtags(results)
+
+        if self.config.get("data.columnar", False):
+            results.compact()
 
-            cls     = SCRAPERS[name]
-            scraper = cls(self.config)
+        if self.store is not None:
+            delta = self.store.take_stats()
+            results.meta["store"] = delta
+            print(f"\n  Store: {delta['new']} new, {delta['changed']} changed, {delta['unchanged']} unchanged")
+            if results.items:
+                results.meta["velocity"] = self.store.velocity(
+                    [item.id for item in results.all_items()], self.config.get("store.velocity_window_hours", 6),
+                )
 
+        self.http.flush()
+        breakers = self.http.breaker_states()
+        if breakers:
+            results.meta["http_breakers"] = breakers
+            print()
+            for host, state in breakers.items():
+                print(f"  Circuit {state['state']}: {host} (tripped {state['trips']}x)")
+
+        cache = self.http.cache_stats()
+        if cache:
+            results.meta["http_cache"] = cache
+            print(f"\n  HTTP cache: {cache['hits']} hits, {cache['revalidated']} revalidated, {cache['misses']} misses")
+
+        print(f"\n  Total: {results.total()} trending items across {len(results.items)} sources\n")
+        return results
+
+    def _run_sequential(self, targets: list, results: AggregatedResults):
+        for name in targets:
             print(f"  [{name.upper()}] fetching...", end=" ", flush=True)
             t0 = time.time()
 
             try:
-                items = scraper.fetch()
-                items = self.filter.apply(items)
-                items = self.scorer.score_all(items)
-                results.add(name, items)
+                scraper      = self._build(name)
+                items, delta = self._collect(scraper)
+                results.add(name, items, delta=delta)
                 elapsed = round(time.time() - t0, 1)
                 print(f"{len(items)} items  ({elapsed}s)")
             except Exception as e:
                 results.add_error(name, str(e))
                 print(f"ERROR — {e}")
 
-        print(f"\n  Total: {results.total()} trending items across {len(results.items)} sources\n")
-        return results
+    def _run_concurrent(self, targets: list, results: AggregatedResults):
+        workers  = self.config.get("aggregator.max_workers", len(targets))
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scraper")
+        pending  = {}
+
+        print(f"  Fetching {len(targets)} sources concurrently...")
+        try:
+            for name in targets:
+                try:
+                    scraper = self._build(name)
+                except Exception as e:
+                    results.add_error(name, str(e))
+                    print(f"  [{name.upper()}] ERROR — {e}")
+                    continue
+                cancel  = threading.Event()
+                scraper.cancel_event = cancel
+                future  = executor.submit(self._gather, scraper)
+                pending[future] = (name, time.time(), self._deadline(name), cancel)
+
+            while pending:
+                now     = time.time()
+                timeout = min(t0 + limit for _, t0, limit, _ in pending.values()) - now
+                done, _ = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, t0, _, _ = pending.pop(future)
+                    elapsed = round(time.time() - t0, 1)
+                    try:
+                        items, delta = self._accept(name, future.result())
+                        results.add(name, items, delta=delta)
+                        print(f"  [{name.upper()}] {len(items)} items  ({elapsed}s)")
+                    except Exception as e:
+                        results.add_error(name, str(e))
+                        print(f"  [{name.upper()}] ERROR — {e}")
+
+                now = time.time()
+                for future, (name, t0, limit, cancel) in list(pending.items()):
+                    if now - t0 >= limit:
+                        cancel.set()
+                        future.cancel()
+                        del pending[future]
+                        results.add_error(name, f"deadline exceeded after {limit}s")
+                        print(f"  [{name.upper()}] TIMEOUT — cancelled after {limit}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_sharded(self, shards: list, results: AggregatedResults):
+        executor, workers = _shard_pool(self.config)
+        queue   = list(shards)
+        pending = {}
+        merged  = {}
+
+        print(f"  Fetching {len(shards)} shards across {workers} processes...")
+        try:
+            while queue or pending:
+                # submit only into free processes, so each deadline starts when its shard does
+                _abandoned.difference_update([f for f in _abandoned if f.done()])
+                while queue and len(pending) < max(1, workers - len(_abandoned)):
+                    name, region = queue.pop(0)
+                    future = executor.submit(_run_shard, name, region, self._breakers())
+                    label  = f"{name.upper()}/{region}" if region else name.upper()
+                    pending[future] = (name, region, label, time.time(), self._deadline(name))
+
+                now     = time.time()
+                timeout = min(t0 + limit for *_, t0, limit in pending.values()) - now
+                done, _ = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, region, label, t0, _ = pending.pop(future)
+                    elapsed = round(time.time() - t0, 1)
+                    try:
+                        items, (counters, timings), cache, breakers = future.result()
+                        merged.setdefault(name, {})[region] = items
+                        metrics.merge(counters, timings)
+                        metrics.observe("fetch", time.time() - t0, source=name, region=region or "all")
+                        if self.http.cache is not None:
+                            self.http.cache.add_stats(cache)
+                        if self.http.guards is not None:
+                            self.http.guards.merge(breakers)
+                        print(f"  [{label}] {len(items)} items  ({elapsed}s)")
+                    except Exception as e:
+                        if isinstance(e, BrokenExecutor):
+                            _reset_shard_pool()
+                        results.add_error(name, f"{region}: {e}" if region else str(e))
+                        print(f"  [{label}] ERROR — {e}")
+
+                now = time.time()
+                for future, (name, region, label, t0, limit) in list(pending.items()):
+                    if now - t0 >= limit:
+                        if not future.cancel():
+                            _abandoned.add(future)
+                        del pending[future]
+                        results.add_error(name, f"{region}: deadline exceeded after {limit}s" if region else f"deadline exceeded after {limit}s")
+                        print(f"  [{label}] TIMEOUT — abandoned after {limit}s")
+        except BrokenExecutor as e:
+            _reset_shard_pool()
+            for name, region in queue + [entry[:2] for entry in pending.values()]:
+                results.add_error(name, f"{region}: {e}" if region else str(e))
+
+        for name in dict.fromkeys(name for name, _ in shards):
+            if name in merged:
+                items, delta, regions = self._merge_regions(name, merged[name])
+                results.add(name, items, delta=delta)
+                if regions:
+                    results.meta.setdefault("regions", {})[name] = regions
+
+    def _breakers(self) -> dict:
+        return self.http.guards.states() if self.http.guards is not None else {}
+
+    def _run_distributed(self, shards: list, results: AggregatedResults):
+        jobs   = []
+        limits = {}
+        for name, region in shards:
+            try:
+                scraper = self._build(name, region)
+            except Exception as e:
+                results.add_error(name, str(e))
+                print(f"  [{name.upper()}] ERROR — {e}")
+                continue
+            plan = scraper.plan() if hasattr(scraper, "plan") else [{"endpoint": "fetch"}]
+            jobs.extend({**job, "source": name, "region": region} for job in plan)
+            limits[name] = limits.get(name, 0) + scraper.max_items
+
+        coordinator = Coordinator(self.queue, self.config.get("distributed.poll_seconds", 0.5))
+        cycle       = coordinator.submit(jobs)
+        local       = self.config.get("distributed.local_workers", 2)
+        profiling   = self.config.get("metrics.profile", False)
+        stop        = threading.Event()
+        threads     = [
+            threading.Thread(target=Worker(self.config, self.queue, scrapers, f"local-{i}", http=self.http).run,
+                             args=(stop, 0.2), daemon=True, name=f"worker-{i}")
+            for i in range(0 if profiling else local)
+        ]
+        print(f"  Cycle {cycle}: {len(jobs)} jobs queued, {local} local worker(s)")
+        t0 = time.time()
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + self.config.get("distributed.cycle_deadline_seconds", 300)
+        if profiling and local:
+            inline = Worker(self.config, self.queue, scrapers, "local-0", http=self.http)
+            # an empty claim can just mean a retry is not due yet, so only stop once the cycle has drained
+            while time.monotonic() < deadline:
+                if inline.run_once():
+                    continue
+                counts = self.queue.progress(cycle)
+                if not counts["pending"] and not counts["leased"]:
+                    break
+                time.sleep(coordinator.poll_seconds)
+        try:
+            counts = coordinator.wait(cycle, max(0.0, deadline - time.monotonic()))
+        finally:
+            stop.set()
+            limit = time.monotonic() + self.config.get("distributed.worker_join_seconds", 30)
+            for t in threads:
+                t.join(max(0.0, limit - time.monotonic()))
+        print(f"  Cycle {cycle}: {counts['done']} done, {counts['failed']} failed  ({round(time.time() - t0, 1)}s)")
+
+        batches, errors = coordinator.collect(cycle)
+        for name in dict.fromkeys(name for name, _ in shards):
+            if name in errors:
+                failed = errors[name]
+                results.add_error(name, f"{len(failed)} job(s) failed, first: {failed[0]}")
+            if name not in batches:
+                continue
+            items, regions = _unique((item.region, item) for item in batches[name])
+            items          = items[:limits[name]]
+            self._strip(items)
+            fresh, known, skipped = self._split(items)
+            kept, rejected        = self._filter(name, fresh)
+            items, delta          = self._accept(name, (self._score(name, kept), known, rejected, skipped))
+            results.add(name, items, delta=delta)
+            regions = {item.id: regions[item.id] for item in items if item.id in regions}
+            if regions:
+                results.meta.setdefault("regions", {})[name] = regions
+            print(f"  [{name.upper()}] {len(items)} items from {len(batches[name])} fetched")
+
+    def _merge_regions(self, name: str, by_region: dict) -> tuple:
+        items, regions = _unique((region, item) for region in self._regions(name) for item in by_region.get(region, ()))
+        removed        = sum(len(batch) for batch in by_region.values()) - len(items)
+        metrics.incr("items", len(items), source=name)
+        metrics.incr("items_dropped", removed, source=name, reason="cross_region")
+        if self.store is None:
+            return items, None, regions
+        fresh, known, skipped = self._split(items)
+        if known:
+            metrics.incr("items_reused", len(known), source=name)
+        self.store.record(fresh, known, skipped=skipped)
+        return items, {item.id for item in fresh}, regions
+
+    def _regions(self, name: str) -> list:
+        return list(self.config.get(f"scrapers.{name}.regions", None) or [None])
+
+    def _dedupe(self, results: AggregatedResults):
+        from .dedupe import NearDuplicateIndex
+        index = NearDuplicateIndex.from_config(self.config)
+        with metrics.timer("dedupe"):
+            kept, sizes = index.dedupe(results.all_items())
+        keep        = {id(item) for item in kept}
+        for name, items in list(results.items.items()):
+            results.add(name, [item for item in items if id(item) in keep], delta=results.delta.get(name))
+
+        removed = sum(sizes) - len(sizes)
+        metrics.incr("items_dropped", removed, source="all", reason="near_duplicate")
+        results.meta["dedupe"] = {"removed": removed, "clusters": sizes}
+        if removed:
+            print(f"\n  Dedupe: {removed} near-duplicates removed across {len(sizes)} clusters")
+
+    def _track_hashtags(self, results: AggregatedResults):
+        fresh = []
+        for source, items in results.items.items():
+            ids = results.delta.get(source)
+            fresh.extend(items if ids is None else [item for item in items if item.id in ids])
+        with metrics.timer("hashtags"):
+            self.hashtags.observe(fresh)
+            self.hashtags.save()
+        top = self.hashtags.top(self.config.get("hashtags.report_top", 10))
+        results.meta["hashtags"] = top
+        if top:
+            print("\n  Hashtags: " + ", ".join(f"#{row['tag']} ({row['rise']:.1f}x)" for row in top[:5]))
+
+    def _build(self, name: str, region: str = None):
+        cls     = scrapers.load(name)
+        scraper = cls(self.config)
+        scraper.http = self.http
+        region = region or self._regions(name)[0]
+        if region:
+            scraper.region = region
+        if self.hashtags is not None and self.config.get("hashtags.feedback", False):
+            scraper.extra_tags = self.hashtags.rising(
+                self.config.get("hashtags.feedback_tags", 3),
+                min_rise=self.config.get("hashtags.min_rise", 1.5),
+                min_count=self.config.get("hashtags.min_count", 3),
+            )
+        return scraper
+
+    def _collect(self, scraper) -> tuple:
+        return self._accept(scraper.source_name, self._gather(scraper))
+
+    def _gather(self, scraper) -> tuple:
+        # only reads the store; the result is recorded by whoever accepts it, so a source
+        # abandoned at its deadline leaves no trace in the store or its stats
+        source = scraper.source_name
+        with metrics.timer("fetch", source=source):
+            if self.config.get("aggregator.streaming", False) and hasattr(scraper, "stream"):
+                items, known, rejected, skipped = self._collect_stream(scraper)
+            else:
+                items = scraper.fetch()
+                self._strip(items)
+                items, known, skipped = self._split(items)
+                items, rejected       = self._filter(source, items)
+        return self._score(source, items), known, rejected, skipped
+
+    def _accept(self, source: str, gathered: tuple) -> tuple:
+        items, known, rejected, skipped = gathered
+        metrics.incr("items", len(items) + len(known), source=source)
+        if self.store is None:
+            return items, None
+        if known:
+            metrics.incr("items_reused", len(known), source=source)
+        self.store.record(items, known, rejected, skipped)
+        return items + known, {item.id for item in items}
+
+    def _score(self, source: str, items: list) -> list:
+        if self.batch is not None:
+            return items
+        with metrics.timer("score", source=source):
+            return self.scorer.score_all(items)
+
+    def _filter(self, source: str, items: list) -> tuple:
+        with metrics.timer("filter", source=source):
+            kept = self.filter.apply(items)
+        metrics.incr("items_dropped", len(items) - len(kept), source=source, reason="content_filter")
+        if self.store is None:
+            return kept, []
+        ids = {id(item) for item in kept}
+        return kept, [item for item in items if id(item) not in ids]
+
+    def _collect_stream(self, scraper) -> tuple:
+        size  = self.config.get("aggregator.stream_chunk", 10)
+        limit = scraper.max_items
+        seen     = set()
+        kept     = []
+        known    = []
+        rejected = []
+        skipped  = 0
+        with closing(scraper.stream()) as stream:
+            while len(kept) + len(known) < limit:
+                chunk = list(islice(stream, size))
+                if not chunk:
+                    break
+                fresh = [item for item in chunk if item.id not in seen]
+                seen.update(item.id for item in fresh)
+                self._strip(fresh)
+                fresh, unchanged, dropped = self._split(fresh)
+                known.extend(unchanged)
+                skipped += dropped
+                passed, dropped = self._filter(scraper.source_name, fresh)
+                kept.extend(passed)
+                rejected.extend(dropped)
+        # fresh items win the last slots; unchanged ones are still in the store for next time
+        kept = kept[:limit]
+        return kept, known[:limit - len(kept)], rejected, skipped
+
+    def _split(self, items: list) -> tuple:
+        if self.store is None:
+            return items, [], 0
+        fresh, known = self.store.split(items)
+        return fresh, known, len(items) - len(fresh) - len(known)
+
+    def _strip(self, items: list):
+        if not self.config.get("data.keep_raw", True):
+            for item in items:
+                item.drop_raw()
+
+    def _deadline(self, name: str) -> float:
+        default = self.config.get("aggregator.deadline_seconds", 90)
+        return float(self.config.get(f"scrapers.{name}.deadline_seconds", default))
+
+
+_shard     = None
+_pool      = None
+_abandoned = set()
+
+
+def _shard_pool(config: Config) -> tuple:
+    global _pool
+    if _pool is None:
+        workers  = config.get("aggregator.shard_workers") or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard, initargs=(config, workers))
+        _pool    = (executor, workers)
+        atexit.register(executor.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def _reset_shard_pool():
+    global _pool
+    if _pool is not None:
+        _pool[0].shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    _abandoned.clear()
+
+
+def _init_shard(config: Config, workers: int):
+    global _shard
+    # a forked child starts with the parent's counters; they are reported by the parent already
+    metrics.reset()
+    _shard = Aggregator(config, store=False)
+    if _shard.http.guards is not None:
+        _shard.http.guards.share(workers)
+
+
+def _run_shard(name: str, region: str, breakers: dict) -> tuple:
+    http = _shard.http
+    if http.guards is not None:
+        http.guards.merge(breakers)
+    scraper  = _shard._build(name, region)
+    items, _ = _shard._collect(scraper)
+    http.flush()
+    cache    = http.cache.take_stats() if http.cache is not None else {}
+    states   = http.guards.states() if http.guards is not None else {}
+    return items, metrics.drain(), cache, states
+
+
+def _unique(pairs) -> tuple:
+    # keeps the first copy of each item, and every region it turned up in when that was more than one
+    unique  = {}
+    regions = {}
+    for region, item in pairs:
+        unique.setdefault(item.id, item)
+        seen = regions.setdefault(item.id, [])
+        if region not in seen:
+            seen.append(region)
+    return list(unique.values()), {key: seen for key, seen in regions.items() if len(seen) > 1}
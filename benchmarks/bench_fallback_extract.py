@@ -0,0 +1,86 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from socialradar.scrapers.extract import hydration_data, iter_objects, orjson
+
+# The regex TikTokScraper._fetch_fallback used before the hydration extractor.
+LEGACY_PATTERN = r'"desc":"([^"]{10,200})".*?"playCount":(\d+).*?"diggCount":(\d+).*?"commentCount":(\d+)'
+
+
+def synthetic_page(posts: int, noise_kb: int, orphans: int, seed: int = 7) -> str:
+    rng   = random.Random(seed)
+    items = {}
+    for i in range(posts):
+        pid = str(7_300_000_000_000_000_000 + i)
+        items[pid] = {
+            "id":     pid,
+            "desc":   f"post {i} " + " ".join(f"#tag{rng.randint(0, 500)}" for _ in range(4)),
+            "author": f"creator{i % 300}",
+            "video":  {"cover": f"https://p16.example.com/{pid}.jpeg", "duration": rng.randint(5, 90)},
+            "stats":  {"playCount": rng.randint(0, 10**8), "diggCount": rng.randint(0, 10**7),
+                       "commentCount": rng.randint(0, 10**5), "shareCount": rng.randint(0, 10**5)},
+            "music":  {"title": "original sound", "desc": "x" * 40},
+        }
+    state = json.dumps({"ItemModule": items, "UserModule": {"users": {}}}, separators=(",", ":"))
+    noise = "".join(f'<div class="c{i}" data-desc="{"y" * 60}">{"z" * 200}</div>' for i in range(noise_kb * 4))
+    # "desc" strings with no counters after them (SEO and comment blocks) make the
+    # lazy .*? groups scan to the end of the page for every candidate.
+    seo   = json.dumps([{"desc": f"related search number {i}"} for i in range(orphans)], separators=(",", ":"))
+    return (
+        "<!DOCTYPE html><html><head><title>trending</title></head><body>"
+        f"{noise}"
+        f'<script id="SIGI_STATE" type="application/json">{state}</script>'
+        f'{noise}<script id="seo" type="application/json">{seo}</script></body></html>'
+    )
+
+
+def legacy(html: str) -> int:
+    return len(re.findall(LEGACY_PATTERN, html))
+
+
+def structured(html: str) -> int:
+    data = hydration_data(html)
+    return sum(1 for _ in iter_objects(data, ("desc", "stats"))) if data is not None else 0
+
+
+def best_of(fn, html: str, repeat: int) -> tuple:
+    best, found = None, 0
+    for _ in range(repeat):
+        t0    = time.perf_counter()
+        found = fn(html)
+        took  = time.perf_counter() - t0
+        best  = took if best is None else min(best, took)
+    return best, found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TikTok fallback page extraction: legacy regex vs hydration JSON")
+    parser.add_argument("pages", nargs="*", help="recorded trending pages (HTML); synthetic pages are used if omitted")
+    parser.add_argument("--posts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--noise-kb", type=int, default=512)
+    parser.add_argument("--orphans", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [(f"synthetic {n} posts", synthetic_page(n, args.noise_kb, args.orphans)) for n in args.posts]
+
+    print(f"\n  json backend: {'orjson' if orjson is not None else 'json'}")
+    print(f"  {'page':<24}  {'size':>8}  {'regex':>10}  {'extract':>10}  {'speedup':>8}  {'posts':>11}")
+    for name, html in pages:
+        t_re, n_re = best_of(legacy, html, args.repeat)
+        t_ex, n_ex = best_of(structured, html, args.repeat)
+        size       = f"{len(html) / 2**20:.1f}MB"
+        print(f"  {name[:24]:<24}  {size:>8}  {t_re:>9.3f}s  {t_ex:>9.3f}s  {t_re / t_ex:>7.1f}x  {n_re:>5}/{n_ex:<5}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import sys
+import gc
+import random
+import argparse
+import tracemalloc
+from socialradar.core.data import TrendItem, TrendBatch
+
+SOURCES    = ("tiktok", "instagram", "reddit", "youtube")
+CATEGORIES = ("trending", "entertainment", "sports", "food", "technology", "news")
+TAGS       = ("fyp", "viral", "trending", "news", "food", "ai", "sports", "foryou")
+
+
+def make_items(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(n):
+        # "".join builds fresh str objects, like values parsed out of JSON
+        title = f"Trending post number {i} about {rng.choice(CATEGORIES)}"
+        yield TrendItem(
+            id=f"{rng.choice(SOURCES)}_{i:08d}",
+            source="".join(rng.choice(SOURCES)),
+            title=title,
+            description=title,
+            url=f"https://example.com/p/{i}",
+            author=f"@creator{i % 5000}",
+            hashtags=[str(t) for t in rng.sample(TAGS, 3)],
+            views=rng.randint(0, 20_000_000),
+            likes=rng.randint(0, 2_000_000),
+            comments=rng.randint(0, 100_000),
+            shares=rng.randint(0, 200_000),
+            category="".join(rng.choice(CATEGORIES)),
+        )
+
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    container = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TrendItem list vs TrendBatch memory benchmark")
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    n    = args.items
+
+    def as_list():
+        items = list(make_items(n))
+        for item in items:
+            item.drop_raw()
+        return items
+
+    rows = [
+        ("list[TrendItem]", lambda: as_list()),
+        ("TrendBatch",      lambda: TrendBatch(make_items(n))),
+    ]
+
+    print(f"\n  {n:,} items")
+    print(f"  {'container':<16}  {'retained':>10}  {'peak':>10}  {'bytes/item':>10}")
+    for name, build in rows:
+        container, current, peak = measure(build)
+        print(f"  {name:<16}  {current / 2**20:>8.1f}MB  {peak / 2**20:>8.1f}MB  {current / n:>10.0f}")
+        del container
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from socialradar.core.config import Config
+from socialradar.core.data import AggregatedResults
+from socialradar.core.filter import ContentFilter
+from socialradar.core.scorer import TrendScorer
+from socialradar.scrapers.tiktok import TikTokScraper
+
+STAGES   = ("parse", "filter", "score", "rank", "report")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+WORDS    = ("viral", "recipe", "goal", "ai", "breaking", "tour", "hack", "review", "live", "update", "new", "best")
+TAGS     = ("fyp", "viral", "trending", "news", "food", "ai", "sports", "foryou", "tech", "music")
+
+
+def synthetic_posts(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "id":     str(7_300_000_000_000_000_000 + i),
+            "desc":   " ".join(rng.choices(WORDS, k=8)) + " " + " ".join(f"#{t}" for t in rng.sample(TAGS, 3)),
+            "author": {"uniqueId": f"creator{i % 5000}"},
+            "video":  {"cover": f"https://p16.example.com/{i}.jpeg"},
+            "stats":  {
+                "playCount":    rng.randint(0, 20_000_000),
+                "diggCount":    rng.randint(0, 2_000_000),
+                "commentCount": rng.randint(0, 100_000),
+                "shareCount":   rng.randint(0, 200_000),
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def chunks(seq: list, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def run_stage(name: str, fn, data: list, chunk: int) -> tuple:
+    latencies = []
+    out       = []
+    for part in chunks(data, chunk):
+        t0 = time.perf_counter()
+        out.extend(fn(part))
+        latencies.append(time.perf_counter() - t0)
+    return out, latencies
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def pipeline(config: Config, posts: list, chunk: int, memory: bool) -> dict:
+    scraper = TikTokScraper(config)
+    filt    = ContentFilter(config)
+    scorer  = TrendScorer(weights=config.get("report.trending_score_weight"))
+    results = AggregatedResults()
+
+    def rank(items):
+        results.add("tiktok", items)
+        return results.all_items()
+
+    stages = {
+        "parse":  lambda part: [i for i in (scraper._parse_post(p) for p in part) if i],
+        "filter": filt.apply,
+        "score":  scorer.score_all,
+        "rank":   rank,
+        "report": lambda part: [json.dumps([item.to_dict() for item in part])],
+    }
+    stats = {}
+    data  = posts
+    for name in STAGES:
+        if memory:
+            tracemalloc.start()
+        t0             = time.perf_counter()
+        # ranking sorts the whole set, so it runs as one batch
+        out, latencies = run_stage(name, stages[name], data, max(1, len(data)) if name == "rank" else chunk)
+        total          = time.perf_counter() - t0
+        peak           = tracemalloc.get_traced_memory()[1] if memory else 0
+        if memory:
+            tracemalloc.stop()
+        stats[name] = {
+            "items":      len(data),
+            "throughput": len(data) / total if total else 0.0,
+            "p50_ms":     percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+            "p99_ms":     percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+            "peak_mb":    peak / 2**20,
+        }
+        if name != "report":
+            data = out
+    return stats
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for size, stages in current.items():
+        for stage, stat in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if not base:
+                continue
+            if stat["throughput"] < base["throughput"] * (1 - tolerance):
+                regressions.append(f"{size} {stage}: throughput {stat['throughput']:,.0f}/s vs {base['throughput']:,.0f}/s")
+            if base["p99_ms"] and stat["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{size} {stage}: p99 {stat['p99_ms']:.2f}ms vs {base['p99_ms']:.2f}ms")
+            if base.get("peak_mb") and stat["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+                regressions.append(f"{size} {stage}: peak {stat['peak_mb']:.1f}MB vs {base['peak_mb']:.1f}MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on synthetic data")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk", type=int, default=1_000, help="items per latency sample")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass (no peak memory)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    args = parser.parse_args(argv)
+
+    config  = Config(args.config)
+    current = {}
+    for n in args.sizes:
+        posts      = synthetic_posts(n)
+        current[n] = pipeline(config, posts, args.chunk, memory=False)
+        if not args.no_memory:
+            # tracemalloc slows allocation-heavy stages, so peaks come from a separate pass
+            traced = pipeline(config, posts, args.chunk, memory=True)
+            for stage, stat in current[n].items():
+                stat["peak_mb"] = traced[stage]["peak_mb"]
+        print(f"\n  {n:,} items")
+        print(f"  {'stage':<8}  {'items/s':>12}  {'p50':>9}  {'p99':>9}  {'peak':>9}")
+        for stage, stat in current[n].items():
+            print(f"  {stage:<8}  {stat['throughput']:>12,.0f}  {stat['p50_ms']:>7.2f}ms  "
+                  f"{stat['p99_ms']:>7.2f}ms  {stat['peak_mb']:>7.1f}MB")
+
+    current = {str(k): v for k, v in current.items()}
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n  Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n  No baseline at {args.baseline} — run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(current, json.load(f), args.tolerance)
+    if regressions:
+        print(f"\n  {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"    {line}")
+        return 1
+    print(f"\n  No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import sys
+import time
+import random
+import argparse
+from socialradar.core.data import TrendItem
+from socialradar.core.scoring import BatchScorer, np
+
+
+def make_items(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        TrendItem(
+            id=f"bench_{i}",
+            source=rng.choice(("tiktok", "instagram", "reddit", "youtube")),
+            title=f"item {i}",
+            views=rng.randint(0, 20_000_000),
+            likes=rng.randint(0, 2_000_000),
+            comments=rng.randint(0, 100_000),
+            shares=rng.randint(0, 200_000),
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch scoring benchmark (pure Python vs NumPy)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("numpy is not installed — only the pure Python backend will run")
+
+    python = BatchScorer(backend="python")
+    vector = BatchScorer(backend="numpy") if np is not None else None
+
+    print(f"\n  {'items':>10}  {'python':>10}  {'numpy':>10}  {'speedup':>8}")
+    for n in args.sizes:
+        items = make_items(n)
+        t_py  = timed(python.score_all, items)
+        if vector is None:
+            print(f"  {n:>10,}  {t_py:>9.3f}s  {'-':>10}  {'-':>8}")
+            continue
+        t_np = timed(vector.score_all, items)
+        print(f"  {n:>10,}  {t_py:>9.3f}s  {t_np:>9.3f}s  {t_py / t_np:>7.1f}x")
+
+    if vector is not None:
+        n       = args.sizes[-1]
+        columns = [np.random.default_rng(7).integers(0, 10_000_000, n) for _ in range(4)]
+        t_cols  = timed(vector.score_columns, *columns)
+        print(f"\n  column re-score of {n:,} rows without TrendItem objects: {t_cols:.3f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import sys
+import argparse
+import statistics
+import subprocess
+
+TARGETS = ("socialradar.core.aggregator", "socialradar.notifications.dispatcher")
+FORBID  = (
+    "requests",
+    "numpy",
+    "socialradar.scrapers.tiktok",
+    "socialradar.scrapers.instagram",
+    "socialradar.scrapers.reddit",
+    "socialradar.scrapers.youtube",
+    "socialradar.notifications.senders",
+)
+
+
+def import_profile(statement: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative), depth)
+    return modules
+
+
+def measure(module: str, startup: set, runs: int) -> tuple:
+    totals = []
+    loaded = {}
+    for _ in range(runs):
+        loaded = import_profile(f"import {module}")
+        totals.append(sum(cum for name, (_, cum, depth) in loaded.items() if depth == 0 and name not in startup) / 1000)
+    return statistics.median(totals), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget for the CLI's entry modules")
+    parser.add_argument("--modules", nargs="+", default=list(TARGETS))
+    parser.add_argument("--budget-ms", type=float, default=120.0, help="max median import time per module")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per module")
+    parser.add_argument("--forbid", nargs="*", default=list(FORBID), help="modules that must not load at import time")
+    args = parser.parse_args(argv)
+
+    startup  = set(import_profile("pass"))
+    failures = []
+    for module in args.modules:
+        total, loaded = measure(module, startup, args.runs)
+        status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+        print(f"\n  {module}: {total:.1f}ms (budget {args.budget_ms:g}ms) {status}")
+        slowest = sorted(((s, n) for n, (s, _, _) in loaded.items() if n not in startup), reverse=True)[:args.top]
+        for self_us, name in slowest:
+            print(f"    {self_us / 1000:>7.2f}ms  {name}")
+        if total > args.budget_ms:
+            failures.append(f"{module} took {total:.1f}ms")
+        for name in args.forbid:
+            if name in loaded:
+                failures.append(f"{module} imports {name} eagerly")
+
+    if failures:
+        print(f"\n  {len(failures)} startup regression(s):")
+        for line in failures:
+            print(f"    {line}")
+        return 1
+    print(f"\n  All entry modules import within {args.budget_ms:g}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from socialradar.core.data import AggregatedResults, TrendBatch
+from socialradar.core.writers import write_results
+from bench_memory import make_items
+
+
+def monolithic(results: AggregatedResults, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"items": [item.to_dict() for item in results.all_items()]}, f)
+
+
+def measure(fn, results: AggregatedResults, path: str) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(results, path)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak memory and speed of report writers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--columnar", action="store_true", help="hold results as TrendBatch columns")
+    args = parser.parse_args(argv)
+
+    writers = {
+        "json.dump":    monolithic,
+        "ndjson":       lambda r, p: write_results(r, p, "ndjson"),
+        "ndjson+gzip":  lambda r, p: write_results(r, p, "ndjson", "gzip"),
+        "json stream":  lambda r, p: write_results(r, p, "json"),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            items   = list(make_items(n))
+            results = AggregatedResults()
+            results.add("all", TrendBatch(items) if args.columnar else items)
+            del items
+            print(f"\n  {n:,} items")
+            print(f"  {'writer':<12}  {'seconds':>8}  {'peak':>9}  {'size':>9}")
+            for name, fn in writers.items():
+                elapsed, peak, size = measure(fn, results, os.path.join(tmp, "out"))
+                print(f"  {name:<12}  {elapsed:>8.2f}  {peak / 2**20:>7.1f}MB  {size / 2**20:>7.1f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
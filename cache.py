@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from ..core.metrics import metrics
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, ttls: dict = None, default_ttl: float = 300):
+        self.path        = path
+        self.max_bytes   = max_bytes
+        self.ttls        = ttls or {}
+        self.default_ttl = default_ttl
+        self.hits        = 0
+        self.misses      = 0
+        self.revalidated = 0
+        self._index = OrderedDict()
+        self._bytes = 0
+        self._lock  = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def from_config(cls, config, path: str = None) -> "ResponseCache":
+        return cls(
+            path=path or config.get("http.cache.path", ".socialradar-cache/http"),
+            max_bytes=int(config.get("http.cache.max_mb", 64) * 1024 * 1024),
+            ttls=config.get("http.cache.ttl_seconds", {}),
+            default_ttl=config.get("http.cache.default_ttl_seconds", 300),
+        )
+
+    def get(self, url: str):
+        key = _key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        try:
+            with open(self._file(key), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            os.utime(self._file(key))
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        return meta, body
+
+    def is_fresh(self, meta: dict, endpoint: str) -> bool:
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        return time.time() - meta["stored_at"] < ttl
+
+    def put(self, url: str, status: int, headers: dict, body: bytes, encoding: str = None):
+        meta = {
+            "url":           url,
+            "status":        status,
+            "headers":       headers,
+            "encoding":      encoding,
+            "etag":          headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at":     time.time(),
+        }
+        self._write(_key(url), meta, body)
+
+    def touch(self, url: str, meta: dict, body: bytes):
+        meta = {**meta, "stored_at": time.time()}
+        self._write(_key(url), meta, body)
+
+    def record(self, outcome: str):
+        metrics.incr("http_cache", outcome=outcome)
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def add_stats(self, stats: dict):
+        with self._lock:
+            self.hits        += stats.get("hits", 0)
+            self.misses      += stats.get("misses", 0)
+            self.revalidated += stats.get("revalidated", 0)
+
+    def take_stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "revalidated": self.revalidated,
+                "entries":     len(self._index),
+                "bytes":       self._bytes,
+            }
+            self.hits = self.misses = self.revalidated = 0
+        return stats
+
+    def _write(self, key: str, meta: dict, body: bytes):
+        data = json.dumps(meta).encode() + b"\n" + body
+        tmp  = f"{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._file(key))
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._bytes += len(data)
+            evicted = self._evict()
+        for old in evicted:
+            self._remove(old)
+
+    def _evict(self) -> list:
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+        self._remove(key)
+
+    def _remove(self, key: str):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def _load(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".entry"):
+                continue
+            st = os.stat(os.path.join(self.path, name))
+            entries.append((st.st_mtime, name[:-len(".entry")], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+        for key in self._evict():
+            self._remove(key)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".entry")
+
+
+def _key(url: str) -> str:
+    return hashlib.sha1(url.encode()).hexdigest()
@@ -0,0 +1,132 @@
+import os
+import json
+import base64
+import threading
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path    = path
+        self.entries = _load(path)
+        self._played = {}
+        self._new    = {}
+        self._lock   = threading.Lock()
+
+    def record(self, url: str, resp: Response):
+        body  = resp.content or b""
+        entry = {
+            "status":  resp.status_code,
+            "headers": dict(resp.headers),
+            "reason":  resp.reason,
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode("ascii")
+        with self._lock:
+            self.entries.setdefault(url, []).append(entry)
+            self._new.setdefault(url, []).append(entry)
+
+    def play(self, url: str):
+        with self._lock:
+            takes = self.entries.get(url)
+            if not takes:
+                return None
+            i = self._played.get(url, 0)
+            self._played[url] = i + 1
+            return takes[min(i, len(takes) - 1)]
+
+    def flush(self):
+        with self._lock:
+            new, self._new = self._new, {}
+            if not new:
+                return
+            # re-read so takes saved by other processes since we loaded are kept
+            saved = _load(self.path)
+            for url, takes in new.items():
+                saved.setdefault(url, []).extend(takes)
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(tmp, self.path)
+
+
+class CassetteLibrary:
+    def __init__(self, directory: str, mode: str):
+        self.directory = directory
+        self.mode      = mode
+        self._tapes    = {}
+        self._lock     = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        mode = config.get("http.cassette.mode", "off")
+        if mode not in ("record", "replay"):
+            return None
+        return cls(config.get("http.cassette.dir", "cassettes"), mode)
+
+    def adapter(self, host: str, pool_connections: int, pool_maxsize: int) -> BaseAdapter:
+        tape = self.tape(host)
+        if self.mode == "replay":
+            return ReplayAdapter(tape)
+        return RecordingAdapter(tape, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def tape(self, host: str) -> Cassette:
+        with self._lock:
+            tape = self._tapes.get(host)
+            if tape is None:
+                tape = self._tapes[host] = Cassette(os.path.join(self.directory, f"{host}.json"))
+            return tape
+
+    def flush(self):
+        with self._lock:
+            tapes = list(self._tapes.values())
+        for tape in tapes:
+            tape.flush()
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        self.cassette.record(request.url, resp)
+        return resp
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.play(request.url)
+        if entry is None:
+            raise ConnectionError(f"no recorded response for {request.url}", request=request)
+        resp = Response()
+        resp.status_code = entry["status"]
+        resp.reason      = entry.get("reason")
+        resp.headers     = CaseInsensitiveDict(entry["headers"])
+        resp.url         = request.url
+        resp.request     = request
+        resp.encoding    = "utf-8" if "body" in entry else None
+        resp._content    = entry["body"].encode("utf-8") if "body" in entry else base64.b64decode(entry["body_b64"])
+        return resp
+
+    def close(self):
+        pass
+
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
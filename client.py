@@ -0,0 +1,269 @@
+import os
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from .cache import ResponseCache
+from .cassette import CassetteLibrary
+from ..core.metrics import metrics
+from ..core.ratelimit import HostGuards
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class HttpClient:
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16, warmup_ttl: float = 1800,
+                 max_in_flight: int = 6, fan_out_workers: int = 8, cache: ResponseCache = None,
+                 cassettes: CassetteLibrary = None, guards: HostGuards = None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize     = pool_maxsize
+        self.warmup_ttl       = warmup_ttl
+        self.max_in_flight    = max_in_flight
+        self.fan_out_workers  = fan_out_workers
+        self.cache            = cache
+        self.cassettes        = cassettes
+        self.guards           = guards
+        self._sessions = {}
+        self._slots    = {}
+        self._warmed   = {}
+        self._tokens   = {}
+        self._lock     = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> "HttpClient":
+        cassettes = CassetteLibrary.from_config(config)
+        replay    = cassettes is not None and cassettes.mode == "replay"
+        cache     = None
+        if config.get("http.cache.enabled", False):
+            # replayed responses must never be served to, or from, the live cache
+            cache = ResponseCache.from_config(config, path=os.path.join(cassettes.directory, ".cache") if replay else None)
+        return cls(
+            pool_connections=config.get("http.pool_connections", 4),
+            pool_maxsize=config.get("http.pool_maxsize", 16),
+            warmup_ttl=config.get("http.warmup_ttl_seconds", 1800),
+            max_in_flight=config.get("http.max_in_flight_per_host", 6),
+            fan_out_workers=config.get("http.fan_out_workers", 8),
+            cache=cache,
+            cassettes=cassettes,
+            # nothing goes over the wire in replay, so there is nothing to pace and no host health to persist
+            guards=None if replay else HostGuards.from_config(config),
+        )
+
+    def session(self, url: str) -> requests.Session:
+        host = _host(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                if self.cassettes is not None:
+                    adapter = self.cassettes.adapter(host, self.pool_connections, self.pool_maxsize)
+                else:
+                    adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def get(self, url: str, headers: dict = None, timeout: float = 10, endpoint: str = None,
+            cancel: threading.Event = None, **kwargs) -> requests.Response:
+        tokens = self._tokens.get(_host(url))
+        if tokens:
+            headers = {**(headers or {}), **tokens}
+        if self.cache is None or endpoint is None:
+            return self._send(url, headers, timeout, endpoint, cancel, **kwargs)
+
+        cached = self.cache.get(url)
+        if cached is not None:
+            meta, body = cached
+            if self.cache.is_fresh(meta, endpoint):
+                self.cache.record("hit")
+                return _cached_response(meta, body)
+            headers = {**(headers or {}), **_validators(meta)}
+
+        resp = self._send(url, headers, timeout, endpoint, cancel, **kwargs)
+        if resp.status_code == 304 and cached is not None:
+            self.cache.touch(url, meta, body)
+            self.cache.record("revalidated")
+            return _cached_response(meta, body)
+
+        self.cache.record("miss")
+        if resp.status_code == 200:
+            self.cache.put(url, resp.status_code, dict(resp.headers), resp.content, resp.encoding)
+        return resp
+
+    def cache_stats(self) -> dict:
+        return self.cache.take_stats() if self.cache is not None else {}
+
+    def _send(self, url: str, headers: dict, timeout: float, endpoint: str = None,
+              cancel: threading.Event = None, **kwargs) -> requests.Response:
+        session = self.session(url)
+        host    = _host(url)
+        labels  = {"host": host, "endpoint": endpoint or "other"}
+        breaker = None
+        if self.guards is not None:
+            breaker = self.guards.breaker(host)
+            wait    = breaker.allow()
+            if wait > 0:
+                metrics.incr("http_short_circuited", **labels)
+                raise CircuitOpenError(f"{host} is cooling down for another {wait:.0f}s")
+            if not self.guards.bucket(host).acquire(cancel):
+                breaker.release()
+                raise requests.ConnectionError(f"request to {host} cancelled while rate limited")
+
+        with self._slot(url):
+            t0 = time.perf_counter()
+            try:
+                resp = session.get(url, headers=headers, timeout=timeout, **kwargs)
+            except Exception as e:
+                metrics.incr("http_errors", error=e.__class__.__name__, **labels)
+                if breaker is not None:
+                    breaker.failure()
+                raise
+            finally:
+                metrics.observe("http_request", time.perf_counter() - t0, **labels)
+        metrics.incr("http_responses", status=resp.status_code, **labels)
+        metrics.incr("http_bytes_received", len(resp.content), host=host)
+
+        if breaker is not None:
+            if resp.status_code == 429 or resp.status_code >= 500:
+                breaker.failure(_retry_after(resp))
+            else:
+                breaker.success()
+        return resp
+
+    def breaker_states(self) -> dict:
+        if self.guards is None:
+            return {}
+        self.guards.save()
+        return self.guards.states()
+
+    def fan_out_iter(self, fn, jobs: list, cancel=None):
+        jobs = list(jobs)
+        if not jobs:
+            return
+        stop   = threading.Event()
+        events = (stop,) if cancel is None else (stop, cancel)
+        if len(jobs) == 1 or self.fan_out_workers <= 1:
+            for job in jobs:
+                result = self._run_job(fn, job, events)
+                if result is not None:
+                    yield result
+            return
+
+        workers  = min(len(jobs), self.fan_out_workers)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+        try:
+            futures = [executor.submit(self._run_job, fn, job, events) for job in jobs]
+            for future in futures:
+                result = future.result()
+                if result is not None:
+                    yield result
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self, url: str, headers: dict = None, timeout: float = 10, cancel: threading.Event = None):
+        host = _host(url)
+        last = self._warmed.get(host)
+        if last is not None and time.time() - last < self.warmup_ttl:
+            return None
+        resp = self.get(url, headers=headers, timeout=timeout, cancel=cancel)
+        if resp.status_code < 400:
+            self._warmed[host] = time.time()
+        return resp
+
+    @contextmanager
+    def _slot(self, url: str):
+        host = _host(url)
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(max(1, self.max_in_flight))
+                self._slots[host] = slot
+        with slot:
+            yield
+
+    def _run_job(self, fn, job, events: tuple):
+        if any(event.is_set() for event in events):
+            return None
+        try:
+            return fn(job)
+        except Exception:
+            return None
+
+    def set_token(self, url: str, name: str, value: str):
+        with self._lock:
+            self._tokens.setdefault(_host(url), {})[name] = value
+
+    def reset(self, url: str):
+        host = _host(url)
+        with self._lock:
+            self._warmed.pop(host, None)
+            self._tokens.pop(host, None)
+            session = self._sessions.pop(host, None)
+        if session is not None:
+            session.close()
+
+    def flush(self):
+        if self.cassettes is not None:
+            self.cassettes.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._warmed.clear()
+            self._tokens.clear()
+        for session in sessions:
+            session.close()
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def require_ok(resp: requests.Response) -> requests.Response:
+    if resp.status_code != 200:
+        raise requests.HTTPError(f"HTTP {resp.status_code} from {_host(resp.url or '')}", response=resp)
+    return resp
+
+
+def _retry_after(resp: requests.Response):
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _validators(meta: dict) -> dict:
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _cached_response(meta: dict, body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = meta["status"]
+    resp.url         = meta["url"]
+    resp.headers     = CaseInsensitiveDict(meta["headers"])
+    resp.encoding    = meta.get("encoding")
+    resp._content    = body
+    return resp
@@ -0,0 +1,227 @@
+import gzip
+import heapq
+import json
+import zlib
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from .config import Config
+from .data import AggregatedResults
+from .metrics import metrics
+
+FACETS = ("source", "category", "hashtag", "region")
+
+
+class Snapshot:
+    def __init__(self, results: AggregatedResults, version: int, cache_entries: int = 256,
+                 previous: "Snapshot" = None):
+        self.version    = version
+        self.fetched_at = results.fetched_at.isoformat()
+        self.errors     = dict(results.errors)
+        self.hashtags   = results.meta.get("hashtags", [])
+        self.sources    = {}
+        carried         = previous.sources if previous is not None else {}
+        streams         = []
+        for source, items in results.items.items():
+            # a source that was not republished keeps its list, and with it the bytes already encoded for it
+            entry = carried.get(source)
+            if entry is None or entry[0] is not items:
+                entry = (items, {})
+            self.sources[source] = entry
+            streams.append(_encoded(results.ranked(source), entry[1]))
+        pairs           = list(heapq.merge(*streams, key=lambda pair: -pair[0].trend_score))
+        self.items      = [item for item, _ in pairs]
+        self.encoded    = [body for _, body in pairs]
+        self.etag       = f'"{version}-{int(results.fetched_at.timestamp())}"'
+        self.index      = {facet: {} for facet in FACETS}
+        self._bodies    = OrderedDict()
+        self._max       = cache_entries
+        self._lock      = threading.Lock()
+        for pos, item in enumerate(self.items):
+            for facet in ("source", "category", "region"):
+                self.index[facet].setdefault(getattr(item, facet).lower(), []).append(pos)
+            for tag in set(tag.lower() for tag in item.hashtags):
+                self.index["hashtag"].setdefault(tag, []).append(pos)
+
+    def select(self, filters: dict) -> list:
+        if not filters:
+            return range(len(self.items))
+        postings = sorted((self.index[facet].get(value, []) for facet, value in filters.items()), key=len)
+        first, rest = postings[0], [set(p) for p in postings[1:]]
+        return [pos for pos in first if all(pos in p for p in rest)]
+
+    def page(self, filters: dict, offset: int, limit: int) -> bytes:
+        matches = self.select(filters)
+        end     = offset + limit
+        head    = {
+            "version":     self.version,
+            "fetched_at":  self.fetched_at,
+            "total":       len(matches),
+            "offset":      offset,
+            "limit":       limit,
+            "next_offset": end if end < len(matches) else None,
+        }
+        items = b",".join(self.encoded[pos] for pos in matches[offset:end])
+        return _encode(head)[:-1] + b',"items":[' + items + b"]}"
+
+    def facets(self) -> dict:
+        return {facet: {value: len(pos) for value, pos in values.items()} for facet, values in self.index.items()}
+
+    def tag(self, key: tuple, compressed: bool) -> str:
+        # one representation per path, query and encoding, so caches never swap them
+        digest = zlib.crc32(repr(key).encode())
+        return f'{self.etag[:-1]}-{digest:08x}{"-gz" if compressed else ""}"'
+
+    def render(self, key: tuple, build, compressed: bool) -> bytes:
+        with self._lock:
+            entry = self._bodies.get(key)
+            if entry is not None:
+                self._bodies.move_to_end(key)
+        if entry is None:
+            body  = build()
+            entry = [body if isinstance(body, bytes) else _encode(body), None]
+            with self._lock:
+                self._bodies[key] = entry
+                while len(self._bodies) > self._max:
+                    self._bodies.popitem(last=False)
+        if not compressed:
+            return entry[0]
+        if entry[1] is None:
+            entry[1] = gzip.compress(entry[0], compresslevel=5)
+        return entry[1]
+
+
+class QueryDaemon:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, page_size: int = 50,
+                 max_page_size: int = 500, cache_entries: int = 256):
+        self.host          = host
+        self.port          = port
+        self.page_size     = page_size
+        self.max_page_size = max_page_size
+        self.cache_entries = cache_entries
+        self.snapshot      = Snapshot(AggregatedResults(), 0, cache_entries)
+        self._merged  = AggregatedResults()
+        self._version = 0
+        self._lock    = threading.Lock()
+        self._server  = None
+        self._thread  = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> "QueryDaemon":
+        return cls(
+            host=config.get("daemon.host", "127.0.0.1"),
+            port=config.get("daemon.port", 8765),
+            page_size=config.get("daemon.page_size", 50),
+            max_page_size=config.get("daemon.max_page_size", 500),
+            cache_entries=config.get("daemon.cache_entries", 256),
+        )
+
+    def publish(self, results: AggregatedResults):
+        with self._lock:
+            for source, items in results.items.items():
+                self._merged.add(source, items)
+                self._merged.errors.pop(source, None)
+            self._merged.errors.update(results.errors)
+            if "hashtags" in results.meta:
+                self._merged.meta["hashtags"] = results.meta["hashtags"]
+            self._merged.fetched_at = results.fetched_at
+            self._version += 1
+            with metrics.timer("daemon_publish"):
+                snapshot = Snapshot(self._merged, self._version, self.cache_entries, previous=self.snapshot)
+            self.snapshot = snapshot
+        print(f"  Query API: snapshot {snapshot.version} live with {len(snapshot.items)} items")
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.app            = self
+        self.port    = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="query-api")
+        self._thread.start()
+        print(f"  Query API listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        app      = self.server.app
+        snapshot = app.snapshot
+        url      = urlsplit(self.path)
+        query    = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            return self._send(200, json.dumps({"version": snapshot.version, "items": len(snapshot.items)}).encode())
+        if url.path not in ("/items", "/facets", "/hashtags", "/meta"):
+            return self._error(404, f"unknown path {url.path}")
+
+        gz = "gzip" in self.headers.get("Accept-Encoding", "")
+        if url.path == "/items":
+            try:
+                offset = max(0, int(query.pop("offset", 0)))
+                limit  = min(app.max_page_size, max(1, int(query.pop("limit", app.page_size))))
+            except ValueError:
+                return self._error(400, "offset and limit must be integers")
+            unknown = set(query) - set(FACETS)
+            if unknown:
+                return self._error(400, f"unknown filter(s): {', '.join(sorted(unknown))}")
+            filters = {facet: value.lower().lstrip("#") for facet, value in query.items()}
+            key     = ("items", tuple(sorted(filters.items())), offset, limit)
+            build   = lambda: snapshot.page(filters, offset, limit)
+        elif url.path == "/facets":
+            key, build = ("facets",), snapshot.facets
+        elif url.path == "/hashtags":
+            key, build = ("hashtags",), lambda: snapshot.hashtags
+        else:
+            key, build = ("meta",), lambda: {
+                "version":    snapshot.version,
+                "fetched_at": snapshot.fetched_at,
+                "total":      len(snapshot.items),
+                "errors":     snapshot.errors,
+            }
+
+        etag = snapshot.tag(key, gz)
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            return self._send(304, b"", etag=etag)
+        with metrics.timer("daemon_query", path=url.path):
+            body = snapshot.render(key, build, gz)
+        self._send(200, body, etag=etag, gz=gz)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def _send(self, status: int, body: bytes, etag: str = None, gz: bool = False):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _encoded(items, cache: dict):
+    for item in items:
+        body = cache.get(item.id)
+        if body is None:
+            body = cache[item.id] = item.to_json()
+        yield item, body
@@ -1,8 +1,30 @@
-from dataclasses import dataclass, field
+import sys
+import json
+import math
+import heapq
+from itertools import islice
+from array import array
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
 from typing import Optional
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+NO_RAW = MappingProxyType({})
+
+
+def _slotted(cls):
+    names = tuple(f.name for f in fields(cls))
+    body  = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ("__dict__", "__weakref__")}
+    body["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+
+@_slotted
 @dataclass
 class TrendItem:
     id:           str
@@ -25,6 +47,19 @@ class TrendItem:
     trend_score:  float         = 0.0
     raw:          dict          = field(default_factory=dict)
 
+    def __post_init__(self):
+        self.source   = sys.intern(self.source)
+        self.category = sys.intern(self.category)
+        self.region   = sys.intern(self.region)
+        self.language = sys.intern(self.language)
+
+    def drop_raw(self):
+        self.raw = NO_RAW
+
+    def __reduce__(self):
+        values = tuple(None if name == "raw" and self.raw is NO_RAW else getattr(self, name) for name in _FIELDS)
+        return _restore_item, values
+
     @property
     def engagement(self) -> int:
         return self.views + self.likes + self.comments + self.shares
@@ -52,6 +87,33 @@ class TrendItem:
             "engagement":   self.engagement,
         }
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "TrendItem":
+        values = {k: v for k, v in d.items() if k in _FIELDS}
+        values["fetched_at"] = datetime.fromisoformat(d["fetched_at"]) if d.get("fetched_at") else datetime.now()
+        if d.get("published_at"):
+            values["published_at"] = datetime.fromisoformat(d["published_at"])
+        return cls(**values)
+
+    def to_json(self) -> bytes:
+        return _dumps(self.to_dict())
+
+
+_FIELDS = tuple(f.name for f in fields(TrendItem))
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _restore_item(*values) -> TrendItem:
+    item = TrendItem(*values)
+    if item.raw is None:
+        item.raw = NO_RAW
+    return item
+
 
 @dataclass
 class AggregatedResults:
@@ -59,18 +121,114 @@ class AggregatedResults:
     items:      dict     = field(default_factory=dict)
     errors:     dict     = field(default_factory=dict)
     meta:       dict     = field(default_factory=dict)
+    delta:      dict     = field(default_factory=dict)
+    _ranked:    dict     = field(default_factory=dict, repr=False, compare=False)
+
+    def add(self, source: str, items: list, delta: set = None):
+        self.items[source]   = items
+        self._ranked[source] = _rank(items)
+        if delta is not None:
+            self.delta[source] = delta
+        else:
+            self.delta.pop(source, None)
 
-    def add(self, source: str, items: list):
-        self.items[source] = items
+    def delta_only(self) -> "AggregatedResults":
+        out = AggregatedResults(fetched_at=self.fetched_at, errors=self.errors, meta=self.meta)
+        for source, items in self.items.items():
+            ids = self.delta.get(source)
+            out.add(source, list(items) if ids is None else [item for item in items if item.id in ids])
+        return out
 
     def add_error(self, source: str, error: str):
         self.errors[source] = error
 
+    def compact(self):
+        for source, items in self.items.items():
+            if not isinstance(items, TrendBatch):
+                self.items[source] = TrendBatch(items)
+
+    def reindex(self):
+        self._ranked = {source: _rank(items) for source, items in self.items.items()}
+
+    def ranked(self, source: str = None, category: str = None):
+        sources = [source] if source is not None else list(self.items)
+        streams = [self._stream(s) for s in sources if s in self.items]
+        for item in heapq.merge(*streams, key=lambda x: -x.trend_score):
+            if category is None or item.category == category:
+                yield item
+
+    def top(self, k: int, source: str = None, category: str = None) -> list:
+        return list(islice(self.ranked(source=source, category=category), k))
+
     def all_items(self) -> list:
-        out = []
-        for items in self.items.values():
-            out.extend(items)
-        return sorted(out, key=lambda x: x.trend_score, reverse=True)
+        return list(self.ranked())
 
     def total(self) -> int:
         return sum(len(v) for v in self.items.values())
+
+    def _stream(self, source: str):
+        items = self.items[source]
+        order = self._ranked.get(source)
+        if order is None or len(order) != len(items):
+            order = self._ranked[source] = _rank(items)
+        for i in order:
+            yield items[i]
+
+
+def _rank(items) -> list:
+    if isinstance(items, TrendBatch):
+        scores = items.columns["trend_score"]
+    else:
+        scores = [item.trend_score for item in items]
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+
+_STR_COLUMNS = ("id", "source", "title", "description", "url", "thumbnail", "author", "category", "region", "language")
+_INT_COLUMNS = ("views", "likes", "comments", "shares")
+
+
+class TrendBatch:
+    def __init__(self, items: list = None):
+        self.columns = {name: [] for name in _STR_COLUMNS}
+        self.columns.update({name: array("q") for name in _INT_COLUMNS})
+        self.columns["hashtags"]     = []
+        self.columns["trend_score"]  = array("d")
+        self.columns["fetched_at"]   = array("d")
+        self.columns["published_at"] = array("d")
+        for item in items or ():
+            self.append(item)
+
+    def append(self, item: TrendItem):
+        c = self.columns
+        for name in _STR_COLUMNS:
+            c[name].append(getattr(item, name))
+        for name in _INT_COLUMNS:
+            c[name].append(getattr(item, name))
+        c["hashtags"].append(tuple(sys.intern(tag) for tag in item.hashtags))
+        c["trend_score"].append(item.trend_score)
+        c["fetched_at"].append(item.fetched_at.timestamp())
+        c["published_at"].append(item.published_at.timestamp() if item.published_at else math.nan)
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __getitem__(self, i):
+        c = self.columns
+        if isinstance(i, slice):
+            batch = TrendBatch()
+            batch.columns = {name: column[i] for name, column in c.items()}
+            return batch
+        published = c["published_at"][i]
+        return TrendItem(
+            **{name: c[name][i] for name in _STR_COLUMNS},
+            **{name: c[name][i] for name in _INT_COLUMNS},
+            hashtags=list(c["hashtags"][i]),
+            trend_score=c["trend_score"][i],
+            fetched_at=datetime.fromtimestamp(c["fetched_at"][i]),
+            published_at=None if math.isnan(published) else datetime.fromtimestamp(published),
+            raw=NO_RAW,
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
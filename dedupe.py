@@ -0,0 +1,111 @@
+import re
+import zlib
+import random
+from collections import defaultdict
+from .data import TrendItem
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# largest prime below 2**32: with a, b < _PRIME and 32-bit crc hashes, a * h + b fits in uint64
+_PRIME = 4294967291
+_WORD  = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.threshold    = threshold
+        self.num_perm     = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array([a for a, _ in self._perms], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._perms], dtype=np.uint64)[:, None]
+
+    @classmethod
+    def from_config(cls, config) -> "NearDuplicateIndex":
+        return cls(
+            threshold=config.get("filters.dedupe_threshold", 0.85),
+            num_perm=config.get("filters.minhash_permutations", 64),
+        )
+
+    def signature(self, item: TrendItem):
+        hashes = {zlib.crc32(s.encode()) for s in _shingles(item, self.shingle_size)}
+        if not hashes:
+            return None
+        if np is not None:
+            h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            return tuple(((self._a * h + self._b) % _PRIME).min(axis=1).tolist())
+        return tuple(min([(a * h + b) % _PRIME for h in hashes]) for a, b in self._perms)
+
+    def clusters(self, items: list) -> list:
+        sigs    = [self.signature(item) for item in items]
+        parent  = list(range(len(items)))
+        buckets = defaultdict(list)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, sig in enumerate(sigs):
+            if sig is None:
+                continue
+            for band in range(self.bands):
+                lo = band * self.rows
+                buckets[(band, sig[lo:lo + self.rows])].append(i)
+
+        checked = set()
+        for members in buckets.values():
+            for n, i in enumerate(members):
+                for j in members[:n]:
+                    if (j, i) in checked or find(i) == find(j):
+                        continue
+                    checked.add((j, i))
+                    if self._similar(sigs[i], sigs[j]):
+                        parent[find(i)] = find(j)
+
+        groups = defaultdict(list)
+        for i in range(len(items)):
+            groups[find(i)].append(items[i])
+        return list(groups.values())
+
+    def dedupe(self, items: list) -> tuple:
+        kept  = []
+        sizes = []
+        for group in self.clusters(items):
+            kept.append(max(group, key=lambda x: x.trend_score))
+            if len(group) > 1:
+                sizes.append(len(group))
+        return kept, sorted(sizes, reverse=True)
+
+    def _similar(self, a: tuple, b: tuple) -> bool:
+        same = sum(1 for x, y in zip(a, b) if x == y)
+        return same >= self.threshold * self.num_perm
+
+
+def _shingles(item: TrendItem, size: int) -> set:
+    text   = item.description if item.description.startswith(item.title) else f"{item.title} {item.description}"
+    words  = _WORD.findall(text.lower())
+    tokens = {f"#{tag.lower()}" for tag in item.hashtags}
+    if len(words) < size:
+        tokens.update(words)
+    else:
+        tokens.update(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+    return tokens
+
+
+def _lsh_params(threshold: float, num_perm: int) -> tuple:
+    best = (1, num_perm)
+    gap  = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        t     = (1.0 / bands) ** (1.0 / rows)
+        if t <= threshold and (gap is None or threshold - t < gap):
+            best, gap = (bands, rows), threshold - t
+    return best
@@ -1,43 +1,184 @@
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from ..core.config import Config
 from ..core.data import AggregatedResults
-from .senders import DiscordSender, TelegramSender, EmailSender
+from ..core.metrics import metrics
+from ..core.ratelimit import TokenBucket
+from ..core.registry import Registry
+
+STYLES = {
+    "discord":  "markdown",
+    "telegram": "markdown",
+    "email":    "plain",
+}
+
+SENDERS = {
+    "discord":  "socialradar.notifications.senders:DiscordSender",
+    "telegram": "socialradar.notifications.senders:TelegramSender",
+    "email":    "socialradar.notifications.senders:EmailSender",
+}
+
+senders = Registry("socialradar.senders", SENDERS)
+
+
+class _Channel:
+    def __init__(self, name: str, sender, bucket: TokenBucket):
+        self.name    = name
+        self.sender  = sender
+        self.bucket  = bucket
+        self.style   = STYLES.get(name, "markdown")
+        self.pending = deque()
+        self.busy    = False
+        self.lock    = threading.Lock()
 
 
 class Dispatcher:
     def __init__(self, config: Config):
-        self.config  = config
-        self.senders = []
+        self.config      = config
+        self.senders     = []
+        self.channels    = []
+        self.background  = config.get("notifications.background", True)
+        self.max_retries = config.get("notifications.max_retries", 3)
+        self.backoff     = config.get("notifications.backoff_seconds", 2.0)
+        self._renders  = OrderedDict()
+        self._lock     = threading.Lock()
+        self._stop     = threading.Event()
+        self._executor = None
         self._init_senders()
 
     def _init_senders(self):
         channels = self.config.get("notifications.channels", {})
+        for name, settings in channels.items():
+            if not (settings or {}).get("enabled"):
+                continue
+            if name not in senders:
+                print(f"  Notifications: no sender registered for channel '{name}', skipping")
+                continue
+            self._add_channel(name, senders.load(name)(settings), settings)
 
-        if channels.get("discord", {}).get("enabled"):
-            self.senders.append(DiscordSender(channels["discord"]))
-
-        if channels.get("telegram", {}).get("enabled"):
-            self.senders.append(TelegramSender(channels["telegram"]))
-
-        if channels.get("email", {}).get("enabled"):
-            self.senders.append(EmailSender(channels["email"]))
+    def _add_channel(self, name: str, sender, settings: dict):
+        bucket = TokenBucket.per_minute(
+            settings.get("rate_per_minute", self.config.get("notifications.rate_per_minute", 30)),
+            burst=settings.get("burst", 1),
+        )
+        self.senders.append(sender)
+        self.channels.append(_Channel(name, sender, bucket))
 
     def send(self, results: AggregatedResults):
         if not self.senders:
             return
+        if self.config.get("notifications.delta_only", False):
+            results = results.delta_only()
+            if not results.total():
+                return
+
+        if not self.background:
+            for channel in self.channels:
+                self._deliver(channel, results)
+            return
+
+        for channel in self.channels:
+            with channel.lock:
+                channel.pending.append(results)
+                if channel.busy:
+                    continue
+                channel.busy = True
+            self._pool().submit(self._drain, channel)
+
+    def flush(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(channel.busy for channel in self.channels):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout: float = 10):
+        self.flush(timeout)
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
-        message = self._format_message(results)
-        for sender in self.senders:
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                workers = self.config.get("notifications.workers", len(self.channels))
+                self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="notify")
+            return self._executor
+
+    def _drain(self, channel: _Channel):
+        while not self._stop.is_set():
+            with channel.lock:
+                if not channel.pending:
+                    channel.busy = False
+                    return
+                batch = list(channel.pending)
+                channel.pending.clear()
+            results = batch[0] if len(batch) == 1 else self._coalesce(batch)
+            self._deliver(channel, results)
+        with channel.lock:
+            channel.busy = False
+
+    def _deliver(self, channel: _Channel, results: AggregatedResults):
+        message = self._render(results, channel.style)
+        name    = channel.sender.__class__.__name__
+        for attempt in range(self.max_retries + 1):
+            if not channel.bucket.acquire(self._stop):
+                return
+            t0 = time.monotonic()
             try:
-                sender.send(message, results)
-                print(f"  Notification sent via {sender.__class__.__name__}")
+                channel.sender.send(message, results)
+                elapsed = time.monotonic() - t0
+                metrics.observe("notify", elapsed, channel=channel.name)
+                print(f"  Notification sent via {name} ({elapsed:.1f}s)")
+                return
             except Exception as e:
-                print(f"  Notification failed ({sender.__class__.__name__}): {e}")
+                metrics.incr("notify_failures", channel=channel.name)
+                if attempt == self.max_retries:
+                    print(f"  Notification failed ({name}) after {attempt + 1} attempts: {e}")
+                    return
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"  Notification failed ({name}): {e} — retrying in {delay:.1f}s")
+                if self._stop.wait(delay):
+                    return
+
+    def _coalesce(self, batch: list) -> AggregatedResults:
+        merged    = AggregatedResults(fetched_at=batch[-1].fetched_at, meta={"coalesced": len(batch)})
+        by_source = {}
+        for results in batch:
+            for item in results.top(10):
+                by_source.setdefault(item.source, {})[item.id] = item
+        for source, items in by_source.items():
+            merged.add(source, list(items.values()))
+        return merged
+
+    def _render(self, results: AggregatedResults, style: str) -> str:
+        key = id(results)
+        with self._lock:
+            entry = self._renders.get(key)
+            if entry is None or entry[0] is not results:
+                entry = self._renders[key] = (results, {})
+                while len(self._renders) > 8:
+                    self._renders.popitem(last=False)
+            cached = entry[1].get(style)
+        if cached is not None:
+            return cached
+        message = self._format_message(results, style)
+        with self._lock:
+            entry[1][style] = message
+        return message
 
-    def _format_message(self, results: AggregatedResults) -> str:
-        items = results.all_items()[:10]
+    def _format_message(self, results: AggregatedResults, style: str = "markdown") -> str:
+        items = results.top(10)
         lines = ["🔥 **SocialRadar — Top Trending Now**\n"]
         for i, item in enumerate(items, 1):
             lines.append(f"{i}. [{item.source.upper()}] {item.title[:80]}")
             lines.append(f"   👁 {item.views:,}  ❤ {item.likes:,}  ⚡ {item.trend_score:.0f}")
             lines.append(f"   {item.url}\n")
-        return "\n".join(lines)
+        message = "\n".join(lines)
+        if style == "plain":
+            message = message.replace("**", "")
+        return message
@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import argparse
+import threading
+from .config import Config
+from .data import TrendItem
+from .metrics import metrics
+from .registry import Registry
+
+QUEUES = {
+    "sqlite": "socialradar.core.jobqueue:SQLiteJobQueue",
+}
+
+queues = Registry("socialradar.queues", QUEUES)
+
+
+def queue_from_config(config: Config):
+    return queues.load(config.get("distributed.queue", "sqlite")).from_config(config)
+
+
+class Coordinator:
+    def __init__(self, queue, poll_seconds: float = 0.5):
+        self.queue        = queue
+        self.poll_seconds = poll_seconds
+
+    def submit(self, jobs: list) -> str:
+        cycle = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.queue.submit(cycle, jobs)
+        return cycle
+
+    def wait(self, cycle: str, deadline: float) -> dict:
+        limit = time.monotonic() + deadline
+        while True:
+            counts = self.queue.progress(cycle)
+            if not counts["pending"] and not counts["leased"]:
+                return counts
+            if time.monotonic() >= limit:
+                self.queue.cancel(cycle)
+                print(f"  Cycle {cycle}: deadline of {deadline:g}s hit with "
+                      f"{counts['pending'] + counts['leased']} jobs unfinished")
+                return self.queue.progress(cycle)
+            time.sleep(self.poll_seconds)
+
+    def collect(self, cycle: str) -> tuple:
+        batches = {}
+        errors  = {}
+        for source, job, state, result, error in self.queue.results(cycle):
+            if state == "done":
+                items = [TrendItem.from_dict(json.loads(line)) for line in (result or b"").splitlines() if line]
+                batches.setdefault(source, []).extend(items)
+            else:
+                errors.setdefault(source, []).append(f"{job['endpoint']}: {error or state}")
+        return batches, errors
+
+
+class Worker:
+    def __init__(self, config: Config, queue, registry: Registry, name: str = None, http=None):
+        if http is None:
+            from ..scrapers.client import HttpClient
+            http = HttpClient.from_config(config)
+        self.config   = config
+        self.queue    = queue
+        self.registry = registry
+        self.name     = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.http     = http
+        self.cancel   = None
+
+    def run(self, stop: threading.Event, idle_seconds: float = 1.0):
+        self.cancel = stop
+        try:
+            while not stop.is_set():
+                if not self.run_once():
+                    stop.wait(idle_seconds)
+        finally:
+            self.http.flush()
+
+    def run_once(self) -> bool:
+        job = self.queue.claim(self.name)
+        if job is None:
+            return False
+        done = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job["id"], done), daemon=True).start()
+        try:
+            with metrics.timer("job", source=job["source"], endpoint=job["endpoint"]):
+                items = self._execute(job)
+            self.queue.complete(job["id"], self.name, b"\n".join(item.to_json() for item in items))
+            metrics.incr("jobs", source=job["source"], outcome="done")
+        except Exception as e:
+            self.queue.fail(job["id"], self.name, f"{type(e).__name__}: {e}")
+            metrics.incr("jobs", source=job["source"], outcome="failed")
+        finally:
+            done.set()
+        return True
+
+    def _execute(self, job: dict) -> list:
+        scraper = self.registry.load(job["source"])(self.config)
+        scraper.http         = self.http
+        scraper.cancel_event = self.cancel
+        if job.get("region"):
+            scraper.region = job["region"]
+        if hasattr(scraper, "run_job"):
+            return scraper.run_job(job)
+        return scraper.fetch()
+
+    def _heartbeat(self, job_id: int, done: threading.Event):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not done.wait(interval):
+            if not self.queue.heartbeat(job_id, self.name):
+                return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Claim and run scrape jobs from the shared queue")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--workers", type=int, default=1, help="worker threads in this process")
+    parser.add_argument("--name", default=None, help="worker name prefix (default host-pid)")
+    args = parser.parse_args(argv)
+
+    from .aggregator import scrapers
+    config  = Config(args.config)
+    queue   = queue_from_config(config)
+    prefix  = args.name or f"{socket.gethostname()}-{os.getpid()}"
+    stop    = threading.Event()
+    threads = [
+        threading.Thread(target=Worker(config, queue, scrapers, f"{prefix}-{i}").run, args=(stop,), daemon=True)
+        for i in range(args.workers)
+    ]
+    for t in threads:
+        t.start()
+    print(f"  {args.workers} worker(s) polling {config.get('distributed.queue', 'sqlite')} queue — Ctrl+C to stop")
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n  Workers stopped.")
+        stop.set()
+        for t in threads:
+            t.join(config.get("distributed.worker_join_seconds", 30))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
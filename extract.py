@@ -0,0 +1,52 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HYDRATION_SCRIPTS = ("__UNIVERSAL_DATA_FOR_REHYDRATION__", "SIGI_STATE", "__NEXT_DATA__")
+
+
+def loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def script_body(html: str, script_id: str):
+    start = html.find(f'id="{script_id}"')
+    if start < 0:
+        return None
+    open_end = html.find(">", start)
+    if open_end < 0:
+        return None
+    close = html.find("</script>", open_end)
+    if close < 0:
+        return None
+    return html[open_end + 1:close]
+
+
+def hydration_data(html: str, script_ids: tuple = HYDRATION_SCRIPTS):
+    for script_id in script_ids:
+        body = script_body(html, script_id)
+        if not body:
+            continue
+        try:
+            return loads(body)
+        except ValueError:
+            continue
+    return None
+
+
+def iter_objects(data, keys: tuple):
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if all(k in node for k in keys):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
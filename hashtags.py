@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from array import array
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0.0
+        self.rows  = [array("d", bytes(8 * width)) for _ in range(depth)]
+
+    def _cells(self, key: str) -> list:
+        h  = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        cells = self._cells(key)
+        # conservative update: only raise the cells that hold the current minimum
+        value = min(row[c] for row, c in zip(self.rows, cells)) + count
+        for row, c in zip(self.rows, cells):
+            if row[c] < value:
+                row[c] = value
+        self.total += count
+        return value
+
+    def estimate(self, key: str) -> float:
+        return min(row[c] for row, c in zip(self.rows, self._cells(key)))
+
+    def scale(self, factor: float):
+        for row in self.rows:
+            for i, v in enumerate(row):
+                if v:
+                    row[i] = v * factor
+        self.total *= factor
+
+
+class HashtagIndex:
+    def __init__(self, path: str = None, width: int = 2048, depth: int = 4, capacity: int = 200,
+                 fast_half_life: float = 3600, slow_half_life: float = 86400):
+        self.path     = path
+        self.capacity = capacity
+        self.half_lives = {"fast": fast_half_life, "slow": slow_half_life}
+        self.sketches   = {name: CountMinSketch(width, depth) for name in self.half_lives}
+        self.heavy    = {}
+        self.updated  = time.time()
+        self._lock    = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def from_config(cls, config) -> "HashtagIndex":
+        return cls(
+            path=config.get("hashtags.path", ".socialradar-cache/hashtags.bin"),
+            width=config.get("hashtags.width", 2048),
+            depth=config.get("hashtags.depth", 4),
+            capacity=config.get("hashtags.capacity", 200),
+            fast_half_life=config.get("hashtags.fast_half_life_minutes", 60) * 60,
+            slow_half_life=config.get("hashtags.slow_half_life_minutes", 1440) * 60,
+        )
+
+    def observe(self, items, now: float = None):
+        now = now or time.time()
+        with self._lock:
+            self._decay(now)
+            for item in items:
+                for tag in {tag.lower() for tag in item.hashtags}:
+                    self.sketches["slow"].add(tag)
+                    self._track(tag, self.sketches["fast"].add(tag))
+
+    def top(self, k: int = 10) -> list:
+        with self._lock:
+            fast, slow = self.sketches["fast"], self.sketches["slow"]
+            rows = []
+            for tag in self.heavy:
+                count = fast.estimate(tag)
+                rows.append({"tag": tag, "count": round(count, 2), "rise": round(self._rise(tag, count), 2)})
+        rows.sort(key=lambda r: r["count"], reverse=True)
+        return rows[:k]
+
+    def rising(self, k: int = 5, min_rise: float = 1.5, min_count: float = 3.0) -> list:
+        rows = [r for r in self.top(self.capacity) if r["count"] >= min_count and r["rise"] >= min_rise]
+        rows.sort(key=lambda r: r["rise"], reverse=True)
+        return [r["tag"] for r in rows[:k]]
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            sketch = self.sketches["fast"]
+            header = {
+                "width":   sketch.width,
+                "depth":   sketch.depth,
+                "updated": self.updated,
+                "totals":  {name: s.total for name, s in self.sketches.items()},
+                "heavy":   self.heavy,
+            }
+            body = b"".join(row.tobytes() for name in self.half_lives for row in self.sketches[name].rows)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n" + body)
+        os.replace(tmp, self.path)
+
+    def _rise(self, tag: str, fast_count: float) -> float:
+        fast, slow = self.sketches["fast"], self.sketches["slow"]
+        slow_share = slow.estimate(tag) / slow.total if slow.total else 0.0
+        fast_share = fast_count / fast.total if fast.total else 0.0
+        return fast_share / slow_share if slow_share else 0.0
+
+    def _track(self, tag: str, count: float):
+        if tag in self.heavy or len(self.heavy) < self.capacity:
+            self.heavy[tag] = count
+            return
+        floor = min(self.heavy, key=self.heavy.get)
+        if count > self.heavy[floor]:
+            del self.heavy[floor]
+            self.heavy[tag] = count
+
+    def _decay(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            for name, sketch in self.sketches.items():
+                sketch.scale(0.5 ** (elapsed / self.half_lives[name]))
+            factor     = 0.5 ** (elapsed / self.half_lives["fast"])
+            self.heavy = {tag: count * factor for tag, count in self.heavy.items()}
+        self.updated = now
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+                body   = f.read()
+        except (OSError, ValueError):
+            return
+        sketch = self.sketches["fast"]
+        if (header["width"], header["depth"]) != (sketch.width, sketch.depth):
+            return
+        size = 8 * sketch.width
+        for n, name in enumerate(self.half_lives):
+            for d, row in enumerate(self.sketches[name].rows):
+                start = (n * sketch.depth + d) * size
+                row[:] = array("d", body[start:start + size])
+            self.sketches[name].total = header["totals"].get(name, 0.0)
+        self.heavy   = dict(list(header["heavy"].items())[:self.capacity])
+        self.updated = header["updated"]
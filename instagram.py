@@ -1,10 +1,11 @@
-import requests
 import re
 import json
 import hashlib
 from datetime import datetime
 from .base import BaseScraper
+from .client import HttpClient, require_ok
 from ..core.data import TrendItem
+from ..core.metrics import metrics
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -20,81 +21,115 @@ TRENDING_URL = "https://www.instagram.com/explore/tags/{tag}/?__a=1&__d=dis"
 
 
 class InstagramScraper(BaseScraper):
+    http         = None
+    cancel_event = None
+    extra_tags   = ()
+
     @property
     def source_name(self) -> str:
         return "instagram"
 
     def fetch(self) -> list:
-        items = []
-        items.extend(self._fetch_explore())
-        items.extend(self._fetch_hashtags())
-        seen  = set()
-        unique = []
+        # runs every sub-request, as before streaming; only stream() consumers stop at max_items
+        return list(self._unique(self.stream()))[:self.max_items]
+
+    def stream(self):
+        if self.http is None:
+            self.http = HttpClient()
+        yield from self._fetch_explore()
+        if not self._cancelled():
+            yield from self._fetch_hashtags()
+
+    def _unique(self, items):
+        seen = set()
         for item in items:
             if item.id not in seen:
                 seen.add(item.id)
-                unique.append(item)
-        return unique[:self.max_items]
+                yield item
 
     def _fetch_explore(self) -> list:
         try:
-            session = requests.Session()
-            session.headers.update(HEADERS)
-            resp = session.get("https://www.instagram.com/", timeout=10)
-            csrf = re.search(r'"csrf_token":"([^"]+)"', resp.text)
-            if csrf:
-                session.headers["X-CSRFToken"] = csrf.group(1)
-
-            resp  = session.get(EXPLORE_URL, timeout=15)
-            if resp.status_code != 200:
-                return self._fetch_hashtag_public("trending")
-
-            data    = resp.json()
-            medias  = data.get("sectional_items", [])
-            items   = []
-            for section in medias:
-                for media in section.get("layout_content", {}).get("medias", []):
-                    item = self._parse_media(media.get("media", {}))
-                    if item:
-                        items.append(item)
-            return items
+            return self._explore()
         except Exception:
             return self._fetch_hashtag_public("trending")
 
-    def _fetch_hashtags(self) -> list:
-        items = []
+    def _explore(self) -> list:
+        self._warm_up()
+        resp = self.http.get(EXPLORE_URL, headers=HEADERS, timeout=15, endpoint="explore", cancel=self.cancel_event)
+        if resp.status_code in (401, 403):
+            # the CSRF token or session cookies went stale; start the host over and try once more
+            self.http.reset(EXPLORE_URL)
+            self._warm_up()
+            resp = self.http.get(EXPLORE_URL, headers=HEADERS, timeout=15, endpoint="explore", cancel=self.cancel_event)
+
+        data    = require_ok(resp).json()
+        medias  = data.get("sectional_items", [])
+        items   = []
+        for section in medias:
+            for media in section.get("layout_content", {}).get("medias", []):
+                item = self._parse_media(media.get("media", {}))
+                if item:
+                    items.append(item)
+        return items
+
+    def _warm_up(self):
+        resp = self.http.warm_up("https://www.instagram.com/", headers=HEADERS, timeout=10, cancel=self.cancel_event)
+        if resp is not None:
+            csrf = re.search(r'"csrf_token":"([^"]+)"', resp.text)
+            if csrf:
+                self.http.set_token(EXPLORE_URL, "X-CSRFToken", csrf.group(1))
+
+    def plan(self) -> list:
+        return [{"endpoint": "explore"}] + [{"endpoint": "hashtag", "tag": tag} for tag in self._hashtags()]
+
+    def run_job(self, job: dict) -> list:
+        if self.http is None:
+            self.http = HttpClient()
+        if job["endpoint"] == "explore":
+            return self._explore()
+        if job["endpoint"] == "hashtag":
+            return self._hashtag(job["tag"])
+        raise ValueError(f"unknown instagram endpoint {job['endpoint']!r}")
+
+    def _hashtags(self) -> list:
         sources  = self.settings.get("sources", [])
         tag_sources = [s for s in sources if s.get("type") == "hashtag"]
         tags = []
         for src in tag_sources:
             tags.extend(src.get("tags", []))
 
-        for tag in tags[:5]:
-            try:
-                new_items = self._fetch_hashtag_public(tag)
-                items.extend(new_items)
-            except Exception:
-                continue
-        return items
+        max_tags = self.settings.get("max_tags", 5)
+        tags     = tags[:max_tags]
+        tags.extend(tag for tag in self.extra_tags if tag not in tags)
+        return tags
+
+    def _fetch_hashtags(self):
+        for batch in self.http.fan_out_iter(self._fetch_hashtag_public, self._hashtags(), cancel=self.cancel_event):
+            yield from batch
+
+    def _cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
 
     def _fetch_hashtag_public(self, tag: str) -> list:
         try:
-            url  = f"https://www.instagram.com/explore/tags/{tag}/?__a=1&__d=dis"
-            resp = requests.get(url, headers=HEADERS, timeout=10)
-            if resp.status_code == 200:
-                data  = resp.json()
-                edges = data.get("graphql", {}).get("hashtag", {}).get("edge_hashtag_to_media", {}).get("edges", [])
-                items = []
-                for edge in edges[:10]:
-                    node = edge.get("node", {})
-                    item = self._parse_node(node, category=tag)
-                    if item:
-                        items.append(item)
-                return items
+            return self._hashtag(tag)
         except Exception:
-            pass
-        return []
+            return []
+
+    def _hashtag(self, tag: str) -> list:
+        url   = f"https://www.instagram.com/explore/tags/{tag}/?__a=1&__d=dis"
+        resp  = require_ok(self.http.get(url, headers=HEADERS, timeout=10, endpoint="hashtag", cancel=self.cancel_event))
+        data  = resp.json()
+        edges = data.get("graphql", {}).get("hashtag", {}).get("edge_hashtag_to_media", {}).get("edges", [])
+        items = []
+        for edge in edges[:10]:
+            node = edge.get("node", {})
+            item = self._parse_node(node, category=tag)
+            if item:
+                items.append(item)
+        return items
 
+    @metrics.timed("parse", source="instagram", kind="media")
     def _parse_media(self, media: dict) -> TrendItem:
         try:
             caption = ""
@@ -129,6 +164,7 @@ class InstagramScraper(BaseScraper):
         except Exception:
             return None
 
+    @metrics.timed("parse", source="instagram", kind="node")
     def _parse_node(self, node: dict, category: str = "trending") -> TrendItem:
         try:
             caption_edges = node.get("edge_media_to_caption", {}).get("edges", [])
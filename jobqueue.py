@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    cycle        TEXT NOT NULL,
+    source       TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    state        TEXT NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until  REAL,
+    worker       TEXT,
+    error        TEXT,
+    result       BLOB,
+    created      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, available_at);
+CREATE INDEX IF NOT EXISTS jobs_by_cycle ON jobs (cycle, state);
+"""
+
+
+class SQLiteJobQueue:
+    def __init__(self, path: str, lease_seconds: float = 60, max_attempts: int = 3,
+                 retry_delay: float = 5, retention_hours: float = 24):
+        self.path          = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts  = max_attempts
+        self.retry_delay   = retry_delay
+        self.retention     = retention_hours * 3600
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config) -> "SQLiteJobQueue":
+        return cls(
+            path=config.get("distributed.path", ".socialradar-cache/jobs.db"),
+            lease_seconds=config.get("distributed.lease_seconds", 60),
+            max_attempts=config.get("distributed.max_attempts", 3),
+            retry_delay=config.get("distributed.retry_delay_seconds", 5),
+            retention_hours=config.get("distributed.retention_hours", 24),
+        )
+
+    def submit(self, cycle: str, jobs: list):
+        now  = time.time()
+        rows = [(cycle, job["source"], json.dumps(job), now, now) for job in jobs]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM jobs WHERE created < ?", (now - self.retention,))
+                self._db.executemany(
+                    "INSERT INTO jobs (cycle, source, payload, available_at, created) VALUES (?, ?, ?, ?, ?)", rows,
+                )
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def claim(self, worker: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                    "error = 'lease expired on ' || worker, worker = NULL "
+                    "WHERE state = 'leased' AND lease_until < ?",
+                    (self.max_attempts, now),
+                )
+                row = self._db.execute(
+                    "SELECT id, payload, attempts FROM jobs WHERE state = 'pending' AND available_at <= ? "
+                    "ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_until = ?, worker = ? "
+                        "WHERE id = ?",
+                        (now + self.lease_seconds, worker, row[0]),
+                    )
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        if row is None:
+            return None
+        return {**json.loads(row[1]), "id": row[0], "attempt": row[2] + 1}
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: bytes) -> bool:
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (result, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker = NULL, lease_until = NULL, available_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (self.max_attempts, error, time.time() + self.retry_delay, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def progress(self, cycle: str) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM jobs WHERE cycle = ? GROUP BY state", (cycle,)).fetchall()
+        counts = dict.fromkeys(("pending", "leased", "done", "failed"), 0)
+        counts.update(rows)
+        return counts
+
+    def results(self, cycle: str):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, payload, state, result, error FROM jobs WHERE cycle = ? ORDER BY id", (cycle,),
+            ).fetchall()
+        for source, payload, state, result, error in rows:
+            yield source, json.loads(payload), state, result, error
+
+    def cancel(self, cycle: str):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = 'failed', error = 'cycle deadline exceeded' "
+                "WHERE cycle = ? AND state IN ('pending', 'leased')",
+                (cycle,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
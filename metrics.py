@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import cProfile
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+
+class Metrics:
+    def __init__(self, prefix: str = "socialradar"):
+        self.prefix = prefix
+        self._lock  = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started  = time.time()
+            self.counters = {}
+            self.timings  = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            stat = self.timings.get(key)
+            if stat is None:
+                self.timings[key] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2]  = max(stat[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def timed(self, name: str, **labels):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - t0, **labels)
+            return wrapper
+        return decorate
+
+    def drain(self) -> tuple:
+        with self._lock:
+            counters, timings = self.counters, self.timings
+            self.counters, self.timings = {}, {}
+        return counters, timings
+
+    def merge(self, counters: dict, timings: dict):
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (count, total, peak) in timings.items():
+                stat = self.timings.get(key)
+                if stat is None:
+                    self.timings[key] = [count, total, peak]
+                else:
+                    stat[0] += count
+                    stat[1] += total
+                    stat[2]  = max(stat[2], peak)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.counters.items()]
+            timings  = [
+                {"name": n, "labels": dict(l), "count": c, "sum": round(s, 6), "max": round(m, 6)}
+                for (n, l), (c, s, m) in self.timings.items()
+            ]
+            started = self.started
+        return {
+            "started_at": started,
+            "ended_at":   time.time(),
+            "counters":   sorted(counters, key=lambda x: x["name"]),
+            "timings":    sorted(timings, key=lambda x: x["name"]),
+        }
+
+    def write_json(self, path: str, record: dict):
+        _ensure_dir(path)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def write_prometheus(self, path: str, record: dict):
+        lines = []
+        for c in record["counters"]:
+            name = f"{self.prefix}_{c['name']}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_labels(c['labels'])} {c['value']}")
+        families = {}
+        for t in record["timings"]:
+            families.setdefault(f"{self.prefix}_{t['name']}_seconds", []).append(t)
+        for name, timings in families.items():
+            lines.append(f"# TYPE {name} summary")
+            for t in timings:
+                lines.append(f"{name}_count{_labels(t['labels'])} {t['count']}")
+                lines.append(f"{name}_sum{_labels(t['labels'])} {t['sum']}")
+            lines.append(f"# TYPE {name}_max gauge")
+            lines.extend(f"{name}_max{_labels(t['labels'])} {t['max']}" for t in timings)
+        lines.append(f"{self.prefix}_cycle_end_timestamp_seconds {record['ended_at']:.0f}")
+
+        _ensure_dir(path)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(_dedupe_types(lines)) + "\n")
+        os.replace(tmp, path)
+
+    def export(self, config) -> dict:
+        record = self.snapshot()
+        if config.get("metrics.json_path"):
+            self.write_json(config.get("metrics.json_path"), record)
+        if config.get("metrics.prometheus_path"):
+            self.write_prometheus(config.get("metrics.prometheus_path"), record)
+        self.reset()
+        return record
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def profiled(config):
+    if not config.get("metrics.profile", False):
+        yield
+        return
+    # covers the calling thread only; the aggregator keeps a profiled cycle on that thread
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        out_dir = config.get("metrics.profile_dir", os.path.join(config.get("app.output_dir", "output"), "profiles"))
+        os.makedirs(out_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(out_dir, f"cycle-{time.strftime('%Y%m%d-%H%M%S')}.prof"))
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _dedupe_types(lines: list) -> list:
+    seen = set()
+    out  = []
+    for line in lines:
+        if line.startswith("# TYPE"):
+            if line in seen:
+                continue
+            seen.add(line)
+        out.append(line)
+    return out
+
+
+def _ensure_dir(path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
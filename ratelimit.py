@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import threading
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate   = float(rate)
+        self.burst  = max(1.0, float(burst))
+        self._level = self.burst
+        self._last  = time.monotonic()
+        self._lock  = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, count: float, burst: float = 1) -> "TokenBucket":
+        return cls(rate=count / 60.0, burst=burst)
+
+    def wait_time(self) -> float:
+        with self._lock:
+            self._refill()
+            if self._level >= 1:
+                self._level -= 1
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return (1 - self._level) / self.rate
+
+    def acquire(self, cancel: threading.Event = None) -> bool:
+        while True:
+            if cancel is not None and cancel.is_set():
+                return False
+            delay = self.wait_time()
+            if delay == 0.0:
+                return True
+            if cancel is not None:
+                if cancel.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+
+    def _refill(self):
+        now         = time.monotonic()
+        self._level = min(self.burst, self._level + (now - self._last) * self.rate)
+        self._last  = now
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 3, cooldown: float = 300, max_cooldown: float = 3600):
+        self.threshold    = threshold
+        self.cooldown     = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures     = 0
+        self.trips        = 0
+        self.open_until   = 0.0
+        self.probing      = False
+        self._lock        = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.open_until > time.time():
+            return "open"
+        return "half_open" if self.trips else "closed"
+
+    def allow(self) -> float:
+        with self._lock:
+            remaining = self.open_until - time.time()
+            if remaining > 0:
+                return remaining
+            if self.trips and self.probing:
+                return 1.0
+            if self.trips:
+                self.probing = True
+            return 0.0
+
+    def release(self):
+        # the caller gave up before sending; let the next request be the half-open probe
+        with self._lock:
+            self.probing = False
+
+    def success(self):
+        with self._lock:
+            self.failures   = 0
+            self.trips      = 0
+            self.open_until = 0.0
+            self.probing    = False
+
+    def failure(self, retry_after: float = None):
+        with self._lock:
+            # requests already in flight when the circuit opened land here too; only the probe may re-trip
+            if self.open_until > time.time() or (self.trips and not self.probing):
+                return
+            self.probing = False
+            if self.trips:
+                wait = self.cooldown * (2 ** self.trips)
+            else:
+                self.failures += 1
+                if retry_after is None and self.failures < self.threshold:
+                    return
+                wait = self.cooldown if self.failures >= self.threshold else 0.0
+            if retry_after is not None:
+                wait = max(wait, retry_after)
+            self.trips     += 1
+            self.failures   = 0
+            self.open_until = time.time() + min(wait, self.max_cooldown)
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "trips": self.trips, "open_until": self.open_until}
+
+    def restore(self, data: dict):
+        self.trips      = data.get("trips", 0)
+        self.open_until = data.get("open_until", 0.0)
+
+
+class HostGuards:
+    def __init__(self, per_minute: float = 60, burst: float = 5, overrides: dict = None,
+                 threshold: int = 3, cooldown: float = 300, max_cooldown: float = 3600, state_path: str = None):
+        self.per_minute   = per_minute
+        self.burst        = burst
+        self.overrides    = overrides or {}
+        self.threshold    = threshold
+        self.cooldown     = cooldown
+        self.max_cooldown = max_cooldown
+        self.state_path   = state_path
+        self._buckets  = {}
+        self._breakers = {}
+        self._lock     = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_config(cls, config) -> "HostGuards":
+        return cls(
+            per_minute=config.get("http.rate_limit.per_minute", 60),
+            burst=config.get("http.rate_limit.burst", 5),
+            overrides=config.get("http.rate_limit.hosts", {}),
+            threshold=config.get("http.breaker.failure_threshold", 3),
+            cooldown=config.get("http.breaker.cooldown_seconds", 300),
+            max_cooldown=config.get("http.breaker.max_cooldown_seconds", 3600),
+            state_path=config.get("http.breaker.state_path"),
+        )
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate   = self.overrides.get(host, self.per_minute)
+                bucket = self._buckets[host] = TokenBucket.per_minute(rate, burst=self.burst)
+            return bucket
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.threshold, self.cooldown, self.max_cooldown)
+            return breaker
+
+    def share(self, parts: int):
+        parts           = max(1, parts)
+        self.per_minute = self.per_minute / parts
+        self.burst      = max(1.0, self.burst / parts)
+        self.overrides  = {host: rate / parts for host, rate in self.overrides.items()}
+
+    def merge(self, states: dict):
+        for host, data in states.items():
+            breaker = self.breaker(host)
+            if data.get("open_until", 0.0) > breaker.open_until or data.get("trips", 0) > breaker.trips:
+                breaker.restore(data)
+
+    def states(self) -> dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: b.to_dict() for host, b in breakers.items() if b.trips or b.failures}
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for host, data in saved.items():
+            self.breaker(host).restore(data)
+
+    def save(self):
+        if not self.state_path:
+            return
+        if os.path.dirname(self.state_path):
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.states(), f)
+        os.replace(tmp, self.state_path)
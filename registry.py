@@ -0,0 +1,37 @@
+import importlib
+
+
+class Registry:
+    def __init__(self, group: str, builtins: dict):
+        self.group    = group
+        self.builtins = dict(builtins)
+        self._plugins = None
+        self._loaded  = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.builtins or name in self.plugins()
+
+    def names(self) -> list:
+        return list(self.builtins) + [name for name in self.plugins() if name not in self.builtins]
+
+    def plugins(self) -> dict:
+        if self._plugins is None:
+            self._plugins = _entry_points(self.group)
+        return self._plugins
+
+    def load(self, name: str):
+        obj = self._loaded.get(name)
+        if obj is None:
+            target = self.builtins.get(name) or self.plugins().get(name)
+            if target is None:
+                raise KeyError(f"nothing registered as {name!r} in {self.group}")
+            module, _, attr = target.partition(":")
+            obj = self._loaded[name] = getattr(importlib.import_module(module), attr)
+        return obj
+
+
+def _entry_points(group: str) -> dict:
+    from importlib import metadata
+    eps      = metadata.entry_points()
+    selected = eps.select(group=group) if hasattr(eps, "select") else eps.get(group, ())
+    return {ep.name: ep.value for ep in selected}
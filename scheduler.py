@@ -1,7 +1,20 @@
 import time
+import random
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from .config import Config
+from .daemon import QueryDaemon
+
+
+class _Job:
+    def __init__(self, name: str, interval: float, sources: list = None):
+        self.name     = name
+        self.interval = interval
+        self.sources  = sources
+        self.anchor   = 0.0
+        self.next_run = 0.0
+        self.running  = False
 
 
 class Scheduler:
@@ -9,36 +22,131 @@ class Scheduler:
         self.config   = config
         self.run_once = run_once
         self.interval = config.get("schedule.interval_minutes", 60) * 60
+        self.jitter   = config.get("schedule.jitter", 0.1)
+        self.adaptive = config.get("schedule.adaptive", True)
+        self.min_interval = config.get("schedule.min_interval_minutes", 10) * 60
+        self.max_interval = config.get("schedule.max_interval_minutes", 240) * 60
         self.running  = False
-        self._thread  = None
+        self.jobs     = self._build_jobs()
+        self.daemon   = QueryDaemon.from_config(config) if config.get("daemon.enabled", False) else None
+        self._stop     = threading.Event()
+        self._wake     = threading.Event()
+        self._lock     = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._thread   = None
+        self._executor = None
 
     def start(self):
+        if not self.jobs:
+            print("  Scheduler has no enabled sources to run")
+            return
         self.running = True
-        print(f"  Scheduler started — running every {self.interval // 60} minutes")
+        self._stop.clear()
+        for job in self.jobs:
+            print(f"  Scheduler started — {job.name} every {job.interval / 60:g} minutes")
         print(f"  Press Ctrl+C to stop\n")
 
-        if self.config.get("schedule.run_on_start", True):
-            self._execute()
+        now = time.monotonic()
+        for job in self.jobs:
+            job.anchor   = now if self.config.get("schedule.run_on_start", True) else now + job.interval
+            job.next_run = job.anchor
 
-        self._thread = threading.Thread(target=self._loop, daemon=True)
+        if self.daemon is not None:
+            self.daemon.start()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix="schedule")
+        self._thread   = threading.Thread(target=self._loop, daemon=True, name="scheduler")
         self._thread.start()
 
         try:
-            while self.running:
-                time.sleep(1)
+            self._stop.wait()
         except KeyboardInterrupt:
             print("\n  Scheduler stopped.")
-            self.running = False
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        self._stop.set()
+        self._wake.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.daemon is not None:
+            self.daemon.stop()
+
+    def _build_jobs(self) -> list:
+        if not self.config.get("schedule.per_source", False):
+            return [_Job("all sources", self.interval)]
+        jobs = []
+        for name in self.config.get("scrapers", {}):
+            if not self.config.is_enabled(name):
+                continue
+            minutes = self.config.get(f"schedule.sources.{name}.interval_minutes", self.interval / 60)
+            jobs.append(_Job(name, minutes * 60, [name]))
+        return jobs
 
     def _loop(self):
-        while self.running:
-            time.sleep(self.interval)
-            if self.running:
-                self._execute()
+        while not self._stop.is_set():
+            self._wake.clear()
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.next_run <= now:
+                    self._dispatch(job, now)
+            wake = min(job.next_run for job in self.jobs)
+            self._wake.wait(max(0.0, wake - time.monotonic()))
 
-    def _execute(self):
-        print(f"  [{datetime.now().strftime('%H:%M:%S')}] Running scrape cycle...")
+    def _dispatch(self, job: _Job, now: float):
+        with self._lock:
+            busy        = job.running
+            job.running = True
+            while job.anchor <= now:
+                job.anchor += job.interval
+            spread       = job.interval * self.jitter
+            job.next_run = max(now, job.anchor + random.uniform(-spread, spread))
+
+        if busy:
+            print(f"  [{datetime.now().strftime('%H:%M:%S')}] {job.name}: previous run still in flight, skipping")
+            return
+        try:
+            self._executor.submit(self._execute, job)
+        except RuntimeError:
+            job.running = False
+
+    def _execute(self, job: _Job):
+        print(f"  [{datetime.now().strftime('%H:%M:%S')}] Running scrape cycle ({job.name})...")
         try:
-            self.run_once()
+            # one aggregator backs every job; its metrics, store and cache counters are per cycle
+            with self._run_lock:
+                if job.sources is None:
+                    results = self.run_once()
+                else:
+                    results = self.run_once(sources=job.sources)
+            if self.daemon is not None and results is not None:
+                self.daemon.publish(results)
+            if self.adaptive and results is not None:
+                self._adapt(job, results)
         except Exception as e:
             print(f"  Scheduler error: {e}")
+        finally:
+            with self._lock:
+                job.running = False
+
+    def _adapt(self, job: _Job, results):
+        if not results.delta:
+            return
+        total = results.total()
+        fresh = sum(len(ids) for ids in results.delta.values())
+        ratio = fresh / total if total else 0.0
+        if ratio >= self.config.get("schedule.shrink_above", 0.5):
+            interval = job.interval * 0.75
+        elif ratio <= self.config.get("schedule.grow_below", 0.1):
+            interval = job.interval * 1.5
+        else:
+            return
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        if interval == job.interval:
+            return
+        with self._lock:
+            job.anchor  += interval - job.interval
+            job.next_run = max(time.monotonic(), job.next_run + interval - job.interval)
+            job.interval = interval
+        self._wake.set()
+        print(f"  {job.name}: {fresh}/{total} new — next runs every {interval / 60:.0f} minutes")
@@ -0,0 +1,59 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METRICS = ("views", "likes", "comments", "shares")
+
+DEFAULT_WEIGHTS = {
+    "views":    0.35,
+    "likes":    0.25,
+    "comments": 0.20,
+    "shares":   0.20,
+}
+
+
+class BatchScorer:
+    def __init__(self, weights: dict = None, backend: str = "auto"):
+        weights      = weights or DEFAULT_WEIGHTS
+        self.weights = [float(weights.get(m, 0.0)) for m in METRICS]
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        if backend == "numpy" and np is None:
+            raise ImportError("numpy backend requested but numpy is not installed")
+        self.backend = backend
+
+    def score_all(self, items: list) -> list:
+        if not items:
+            return items
+        if self.backend == "numpy":
+            counts = np.fromiter(
+                (v for item in items for v in (item.views, item.likes, item.comments, item.shares)),
+                dtype=np.float64, count=len(items) * len(METRICS),
+            ).reshape(len(items), len(METRICS))
+            scores = self._score_matrix(counts).tolist()
+        else:
+            scores = self._score_rows([(item.views, item.likes, item.comments, item.shares) for item in items])
+        for item, score in zip(items, scores):
+            item.trend_score = score
+        return items
+
+    def score_columns(self, views, likes, comments, shares):
+        if self.backend == "numpy":
+            counts = np.column_stack([np.asarray(c, dtype=np.float64) for c in (views, likes, comments, shares)])
+            return self._score_matrix(counts)
+        return self._score_rows(list(zip(views, likes, comments, shares)))
+
+    def _score_matrix(self, counts):
+        logs  = np.log1p(np.maximum(counts, 0.0))
+        peaks = logs.max(axis=0)
+        peaks[peaks == 0] = 1.0
+        return (logs / peaks) @ np.asarray(self.weights) * 100.0
+
+    def _score_rows(self, rows: list) -> list:
+        logs  = [[math.log1p(max(v, 0)) for v in row] for row in rows]
+        peaks = [max(col) or 1.0 for col in zip(*logs)]
+        norm  = [w / p for w, p in zip(self.weights, peaks)]
+        return [100.0 * sum(x * n for x, n in zip(row, norm)) for row in logs]
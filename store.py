@@ -0,0 +1,182 @@
+import os
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id          TEXT PRIMARY KEY,
+    source      TEXT NOT NULL,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    views       INTEGER NOT NULL,
+    likes       INTEGER NOT NULL,
+    comments    INTEGER NOT NULL,
+    shares      INTEGER NOT NULL,
+    trend_score REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    id       TEXT NOT NULL,
+    at       REAL NOT NULL,
+    seconds  REAL NOT NULL,
+    views    INTEGER NOT NULL,
+    likes    INTEGER NOT NULL,
+    comments INTEGER NOT NULL,
+    shares   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deltas_by_item ON deltas (id, at);
+CREATE INDEX IF NOT EXISTS items_by_last_seen ON items (last_seen);
+"""
+
+_BATCH = 500
+
+# counters as of the last filter/score pass, and whether the filter kept the item;
+# added through ALTER TABLE so stores written before these columns keep working
+_ADDED = (
+    "processed_views INTEGER NOT NULL DEFAULT 0",
+    "processed_likes INTEGER NOT NULL DEFAULT 0",
+    "processed_comments INTEGER NOT NULL DEFAULT 0",
+    "processed_shares INTEGER NOT NULL DEFAULT 0",
+    "kept INTEGER NOT NULL DEFAULT 1",
+)
+
+
+class ItemStore:
+    def __init__(self, path: str, change_threshold: float = 0.10, retention_days: float = 7):
+        self.path             = path
+        self.change_threshold = change_threshold
+        self.retention        = retention_days * 86400
+        self.stats            = {"new": 0, "changed": 0, "unchanged": 0}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+        self.prune()
+
+    @classmethod
+    def from_config(cls, config) -> "ItemStore":
+        return cls(
+            path=config.get("store.path", ".socialradar-cache/items.db"),
+            change_threshold=config.get("store.change_threshold", 0.10),
+            retention_days=config.get("store.retention_days", 7),
+        )
+
+    def split(self, items: list) -> tuple:
+        rows    = self._lookup([item.id for item in items], "processed_views, processed_likes, "
+                               "processed_comments, processed_shares, trend_score, kept")
+        fresh   = []
+        known   = []
+        for item in items:
+            row = rows.get(item.id)
+            if row is None or self._moved(item, row):
+                fresh.append(item)
+            elif row[5]:
+                item.trend_score = row[4]
+                known.append(item)
+        return fresh, known
+
+    def record(self, items: list, known: list = (), rejected: list = (), skipped: int = 0):
+        everything = [*items, *known, *rejected]
+        now  = time.time()
+        rows = self._lookup([item.id for item in everything], "views, likes, comments, shares, last_seen")
+        new  = sum(1 for group in (items, rejected) for item in group if item.id not in rows)
+        with self._lock:
+            self.stats["new"]       += new
+            self.stats["changed"]   += len(items) + len(rejected) - new
+            self.stats["unchanged"] += len(known) + skipped
+        if not everything:
+            return
+        deltas    = []
+        processed = []
+        for item in everything:
+            row = rows.get(item.id)
+            if row is not None:
+                deltas.append((
+                    item.id, now, now - row[4],
+                    item.views - row[0], item.likes - row[1], item.comments - row[2], item.shares - row[3],
+                ))
+        for kept, group in ((1, items), (0, rejected)):
+            processed.extend((
+                item.id, item.source, now, now,
+                item.views, item.likes, item.comments, item.shares, item.trend_score,
+                item.views, item.likes, item.comments, item.shares, kept,
+            ) for item in group)
+        sightings = [(now, item.views, item.likes, item.comments, item.shares, item.id) for item in known]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET last_seen=excluded.last_seen, views=excluded.views, "
+                "likes=excluded.likes, comments=excluded.comments, shares=excluded.shares, "
+                "trend_score=excluded.trend_score, processed_views=excluded.processed_views, "
+                "processed_likes=excluded.processed_likes, processed_comments=excluded.processed_comments, "
+                "processed_shares=excluded.processed_shares, kept=excluded.kept",
+                processed,
+            )
+            self._db.executemany(
+                "UPDATE items SET last_seen=?, views=?, likes=?, comments=?, shares=? WHERE id=?", sightings,
+            )
+            self._db.executemany("INSERT INTO deltas VALUES (?, ?, ?, ?, ?, ?, ?)", deltas)
+
+    def velocity(self, ids: list, window_hours: float = 6) -> dict:
+        since = time.time() - window_hours * 3600
+        out   = {}
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, SUM(views + likes + comments + shares), SUM(seconds) FROM deltas "
+                    f"WHERE at >= ? AND id IN ({marks}) GROUP BY id",
+                    (since, *chunk),
+                ).fetchall()
+            for item_id, gained, seconds in rows:
+                if seconds:
+                    out[item_id] = gained / seconds * 3600
+        return out
+
+    def take_stats(self) -> dict:
+        with self._lock:
+            stats      = dict(self.stats)
+            self.stats = dict.fromkeys(stats, 0)
+        return stats
+
+    def prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM items WHERE last_seen < ?", (cutoff,))
+            self._db.execute("DELETE FROM deltas WHERE at < ?", (cutoff,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _lookup(self, ids: list, columns: str) -> dict:
+        out = {}
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._db.execute(f"SELECT id, {columns} FROM items WHERE id IN ({marks})", chunk).fetchall()
+            for row in rows:
+                out[row[0]] = row[1:]
+        return out
+
+    def _migrate(self):
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(items)")}
+        with self._db:
+            for column in _ADDED:
+                if column.split()[0] not in columns:
+                    self._db.execute(f"ALTER TABLE items ADD COLUMN {column}")
+
+    def _moved(self, item, row: tuple) -> bool:
+        before = row[0] + row[1] + row[2] + row[3]
+        after  = item.views + item.likes + item.comments + item.shares
+        if before <= 0:
+            return after > 0
+        return abs(after - before) / before >= self.change_threshold
+
+
+def _chunks(ids: list):
+    for i in range(0, len(ids), _BATCH):
+        yield ids[i:i + _BATCH]
@@ -0,0 +1,34 @@
+import pytest
+from socialradar.core import dedupe
+from socialradar.core.data import TrendItem
+from socialradar.core.dedupe import NearDuplicateIndex
+
+
+def _item(n: int, title: str) -> TrendItem:
+    return TrendItem(id=str(n), source="tiktok", title=title, description=title, hashtags=["fyp", f"tag{n % 3}"])
+
+
+TITLES = [
+    "POV: AI is taking over creative jobs and no one is talking about it",
+    "POV AI is taking over creative jobs and no one is talking about it!!",
+    "This cooking hack just changed my life forever (seriously try this)",
+    "The most insane sports moment you will ever see in your lifetime",
+    "ok",
+]
+
+
+def test_numpy_and_python_signatures_match(monkeypatch):
+    pytest.importorskip("numpy")
+    index = NearDuplicateIndex(num_perm=64)
+    items = [_item(n, title) for n, title in enumerate(TITLES)]
+    fast  = [index.signature(item) for item in items]
+    monkeypatch.setattr(dedupe, "np", None)
+    assert [index.signature(item) for item in items] == fast
+
+
+def test_near_duplicates_cluster_together():
+    index = NearDuplicateIndex(threshold=0.5, num_perm=64)
+    items = [_item(n, title) for n, title in enumerate(TITLES)]
+    kept, sizes = index.dedupe(items)
+    assert sizes == [2]
+    assert len(kept) == len(items) - 1
@@ -0,0 +1,117 @@
+import time
+import threading
+from socialradar.core.data import AggregatedResults, TrendItem
+from socialradar.notifications import dispatcher as dispatch
+from socialradar.notifications.dispatcher import Dispatcher
+
+FAST = {"rate_per_minute": 60000, "burst": 10}
+
+
+class _Config:
+    def __init__(self, values: dict):
+        self.values = values
+
+    def get(self, key: str, default=None):
+        return self.values.get(key, default)
+
+
+class FakeSender:
+    def __init__(self, delay: float = 0, failures: int = 0):
+        self.delay    = delay
+        self.failures = failures
+        self.calls    = []
+        self.sent     = []
+        self.started  = threading.Event()
+
+    def send(self, message: str, results: AggregatedResults):
+        self.calls.append(time.monotonic())
+        self.started.set()
+        time.sleep(self.delay)
+        if len(self.calls) <= self.failures:
+            raise ConnectionError(f"attempt {len(self.calls)} refused")
+        self.sent.append((message, results))
+
+
+def _dispatcher(**values) -> Dispatcher:
+    return Dispatcher(_Config({"notifications.backoff_seconds": 0.01, **values}))
+
+
+def _results(n: int) -> AggregatedResults:
+    results = AggregatedResults()
+    results.add("tiktok", [TrendItem(id=f"t{n}", source="tiktok", title=f"trend {n}", trend_score=n)])
+    return results
+
+
+def test_channels_deliver_in_parallel():
+    notifier = _dispatcher()
+    slow     = [FakeSender(delay=0.3), FakeSender(delay=0.3)]
+    for name, sender in zip(("discord", "telegram"), slow):
+        notifier._add_channel(name, sender, FAST)
+    t0 = time.monotonic()
+    notifier.send(_results(1))
+    assert time.monotonic() - t0 < 0.1
+    assert notifier.flush(5)
+    assert time.monotonic() - t0 < 0.55
+    assert [len(sender.sent) for sender in slow] == [1, 1]
+    notifier.close()
+
+
+def test_failed_send_retries_with_backoff(monkeypatch):
+    monkeypatch.setattr(dispatch.random, "uniform", lambda a, b: 1.0)
+    notifier = _dispatcher(**{"notifications.max_retries": 3})
+    flaky    = FakeSender(failures=2)
+    notifier._add_channel("discord", flaky, FAST)
+    notifier.send(_results(1))
+    assert notifier.flush(5)
+    assert len(flaky.calls) == 3 and len(flaky.sent) == 1
+    gaps = [b - a for a, b in zip(flaky.calls, flaky.calls[1:])]
+    assert gaps[0] >= 0.01 and gaps[1] >= 0.02
+    notifier.close()
+
+
+def test_send_gives_up_after_max_retries():
+    notifier = _dispatcher(**{"notifications.max_retries": 2})
+    broken   = FakeSender(failures=10)
+    healthy  = FakeSender()
+    notifier._add_channel("discord", broken, FAST)
+    notifier._add_channel("email", healthy, FAST)
+    notifier.send(_results(1))
+    assert notifier.flush(5)
+    assert len(broken.calls) == 3 and not broken.sent
+    assert len(healthy.sent) == 1
+    notifier.close()
+
+
+def test_backlog_on_a_slow_channel_is_coalesced():
+    notifier = _dispatcher()
+    slow     = FakeSender(delay=0.2)
+    notifier._add_channel("discord", slow, FAST)
+    notifier.send(_results(1))
+    assert slow.started.wait(2)
+    notifier.send(_results(2))
+    notifier.send(_results(3))
+    assert notifier.flush(5)
+    assert len(slow.sent) == 2
+    merged = slow.sent[1][1]
+    assert merged.meta["coalesced"] == 2
+    assert sorted(item.id for item in merged.all_items()) == ["t2", "t3"]
+    notifier.close()
+
+
+def test_render_is_shared_by_channels_with_the_same_style(monkeypatch):
+    notifier = _dispatcher(**{"notifications.background": False})
+    rendered = []
+    original = notifier._format_message
+
+    def counting(results, style):
+        rendered.append(style)
+        return original(results, style)
+
+    monkeypatch.setattr(notifier, "_format_message", counting)
+    senders = {name: FakeSender() for name in ("discord", "telegram", "email")}
+    for name, sender in senders.items():
+        notifier._add_channel(name, sender, FAST)
+    notifier.send(_results(1))
+    assert sorted(rendered) == ["markdown", "plain"]
+    assert senders["discord"].sent[0][0] == senders["telegram"].sent[0][0]
+    assert "**" not in senders["email"].sent[0][0]
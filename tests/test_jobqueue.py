@@ -0,0 +1,96 @@
+import time
+import threading
+from socialradar.core.data import TrendItem
+from socialradar.core.distributed import Coordinator, Worker
+from socialradar.core.jobqueue import SQLiteJobQueue
+from socialradar.core.registry import Registry
+
+CALLS = {}
+
+
+class FlakyScraper:
+    max_items = 5
+
+    def __init__(self, config):
+        pass
+
+    def run_job(self, job: dict) -> list:
+        endpoint = job["endpoint"]
+        CALLS[endpoint] = CALLS.get(endpoint, 0) + 1
+        if endpoint == "broken" or (endpoint == "flaky" and CALLS[endpoint] == 1):
+            raise RuntimeError(f"{endpoint} attempt {CALLS[endpoint]}")
+        return [TrendItem(id=endpoint, source="flaky", title=endpoint)]
+
+
+class _Http:
+    def flush(self):
+        pass
+
+
+def _queue(tmp_path, **kwargs) -> SQLiteJobQueue:
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"), **kwargs)
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=0.1)
+    queue.submit("c1", [{"source": "flaky", "endpoint": "a"}])
+    job = queue.claim("w1")
+    assert job["attempt"] == 1
+    assert queue.claim("w2") is None
+    time.sleep(0.15)
+    again = queue.claim("w2")
+    assert again["id"] == job["id"] and again["attempt"] == 2
+    assert not queue.complete(job["id"], "w1", b"stale")
+    assert queue.complete(job["id"], "w2", b"fresh")
+    assert queue.progress("c1")["done"] == 1
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=0.2)
+    queue.submit("c1", [{"source": "flaky", "endpoint": "a"}])
+    job = queue.claim("w1")
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(job["id"], "w1")
+    assert queue.claim("w2") is None
+    assert not queue.heartbeat(job["id"], "w2")
+
+
+def test_failed_job_waits_for_retry_then_gives_up(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2, retry_delay=0.1)
+    queue.submit("c1", [{"source": "flaky", "endpoint": "a"}])
+    job = queue.claim("w1")
+    assert queue.fail(job["id"], "w1", "boom")
+    assert queue.claim("w1") is None
+    time.sleep(0.15)
+    job = queue.claim("w2")
+    assert job["attempt"] == 2
+    assert queue.fail(job["id"], "w2", "boom again")
+    assert queue.progress("c1") == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_two_workers_drain_a_cycle_with_retries(tmp_path):
+    CALLS.clear()
+    queue       = _queue(tmp_path, max_attempts=2, retry_delay=0.05)
+    registry    = Registry("socialradar.test", {"flaky": f"{__name__}:FlakyScraper"})
+    coordinator = Coordinator(queue, poll_seconds=0.02)
+    endpoints   = ["ok", "flaky", "broken", "more"]
+    cycle       = coordinator.submit([{"source": "flaky", "endpoint": e} for e in endpoints])
+
+    stop    = threading.Event()
+    workers = [Worker(None, queue, registry, f"w{i}", http=_Http()) for i in range(2)]
+    threads = [threading.Thread(target=w.run, args=(stop, 0.02), daemon=True) for w in workers]
+    for t in threads:
+        t.start()
+    try:
+        counts = coordinator.wait(cycle, 10)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(5)
+
+    assert counts == {"pending": 0, "leased": 0, "done": 3, "failed": 1}
+    assert CALLS == {"ok": 1, "flaky": 2, "broken": 2, "more": 1}
+    batches, errors = coordinator.collect(cycle)
+    assert sorted(item.id for item in batches["flaky"]) == ["flaky", "more", "ok"]
+    assert errors["flaky"] == ["broken: RuntimeError: broken attempt 2"]
@@ -1,10 +1,11 @@
-import requests
 import re
 import json
-import hashlib
 from datetime import datetime
 from .base import BaseScraper
+from .client import HttpClient, require_ok
+from .extract import hydration_data, iter_objects
 from ..core.data import TrendItem
+from ..core.metrics import metrics
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -13,8 +14,13 @@ HEADERS = {
     "Referer": "https://www.tiktok.com/",
 }
 
-TRENDING_HASHTAGS_URL = "https://www.tiktok.com/api/explore/item_list/?aid=1988&count={count}&cursor=0&sourceType=68"
-DISCOVER_URL          = "https://www.tiktok.com/api/discover/item_list/?aid=1988&count={count}&type=1"
+TRENDING_HASHTAGS_URL = "https://www.tiktok.com/api/explore/item_list/?aid=1988&count={count}&cursor=0&sourceType=68&region={region}"
+DISCOVER_URL          = "https://www.tiktok.com/api/discover/item_list/?aid=1988&count={count}&type=1&region={region}"
+
+REGION_LOCALES = {
+    "US": "en-US", "GB": "en-GB", "CA": "en-CA", "AU": "en-AU", "IE": "en-IE", "IN": "en-IN",
+    "DE": "de-DE", "FR": "fr-FR", "ES": "es-ES", "MX": "es-MX", "BR": "pt-BR", "JP": "ja-JP",
+}
 
 CATEGORY_HASHTAGS = {
     "entertainment": ["entertainment", "viral", "fyp", "trending", "foryou"],
@@ -26,90 +32,138 @@ CATEGORY_HASHTAGS = {
 
 
 class TikTokScraper(BaseScraper):
+    http         = None
+    cancel_event = None
+    region       = "US"
+    extra_tags   = ()
+
     @property
     def source_name(self) -> str:
         return "tiktok"
 
     def fetch(self) -> list:
-        items = []
-        items.extend(self._fetch_trending())
-        items.extend(self._fetch_by_hashtags())
-        seen  = set()
-        unique = []
+        # runs every sub-request, as before streaming; only stream() consumers stop at max_items
+        return list(self._unique(self.stream()))[:self.max_items]
+
+    def stream(self):
+        if self.http is None:
+            self.http = HttpClient()
+        yield from self._fetch_trending()
+        if not self._cancelled():
+            yield from self._fetch_by_hashtags()
+
+    @property
+    def locale(self) -> str:
+        return REGION_LOCALES.get(self.region, "en-US")
+
+    @property
+    def headers(self) -> dict:
+        lang = self.locale.split("-")[0]
+        return {**HEADERS, "Accept-Language": f"{self.locale},{lang};q=0.9"}
+
+    def _unique(self, items):
+        seen = set()
         for item in items:
             if item.id not in seen:
                 seen.add(item.id)
-                unique.append(item)
-        return unique[:self.max_items]
+                yield item
 
     def _fetch_trending(self) -> list:
-        items = []
         try:
-            session = requests.Session()
-            session.headers.update(HEADERS)
-            session.get("https://www.tiktok.com/", timeout=10)
-
-            url  = TRENDING_HASHTAGS_URL.format(count=self.max_items)
-            resp = session.get(url, timeout=15)
-            if resp.status_code != 200:
-                return self._fetch_fallback()
-
-            data  = resp.json()
-            posts = data.get("itemList", [])
-            for post in posts:
-                item = self._parse_post(post)
-                if item:
-                    items.append(item)
+            return self._trending()
         except Exception:
             return self._fetch_fallback()
+
+    def _trending(self) -> list:
+        self.http.warm_up("https://www.tiktok.com/", headers=self.headers, timeout=10, cancel=self.cancel_event)
+
+        url  = TRENDING_HASHTAGS_URL.format(count=self.max_items, region=self.region)
+        resp = require_ok(self.http.get(url, headers=self.headers, timeout=15, endpoint="trending", cancel=self.cancel_event))
+
+        data  = resp.json()
+        posts = data.get("itemList", [])
+        items = []
+        for post in posts:
+            item = self._parse_post(post)
+            if item:
+                items.append(item)
         return items
 
-    def _fetch_by_hashtags(self) -> list:
-        items  = []
+    def plan(self) -> list:
+        jobs = [{"endpoint": "trending"}]
+        jobs.extend({"endpoint": "hashtag", "category": cat, "tag": tag} for cat, tag in self._hashtag_jobs())
+        return jobs
+
+    def run_job(self, job: dict) -> list:
+        if self.http is None:
+            self.http = HttpClient()
+        if job["endpoint"] == "trending":
+            return self._trending()
+        if job["endpoint"] == "hashtag":
+            return self._hashtag((job["category"], job["tag"]))
+        raise ValueError(f"unknown tiktok endpoint {job['endpoint']!r}")
+
+    def _hashtag_jobs(self) -> list:
         categories = self.settings.get("categories", ["trending"])
-        for cat in categories[:3]:
+        max_cats   = self.settings.get("max_categories", 3)
+        per_cat    = self.settings.get("tags_per_category", 2)
+        jobs = []
+        for cat in categories[:max_cats]:
             tags = CATEGORY_HASHTAGS.get(cat, [cat])
-            for tag in tags[:2]:
-                try:
-                    url  = f"https://www.tiktok.com/api/search/item/full/?keyword=%23{tag}&count=10&cursor=0&aid=1988"
-                    resp = requests.get(url, headers=HEADERS, timeout=10)
-                    if resp.status_code == 200:
-                        data  = resp.json()
-                        posts = data.get("item_list", data.get("itemList", []))
-                        for post in posts[:5]:
-                            item = self._parse_post(post, category=cat)
-                            if item:
-                                items.append(item)
-                except Exception:
-                    continue
+            jobs.extend((cat, tag) for tag in tags[:per_cat])
+        queried = {tag for _, tag in jobs}
+        jobs.extend(("trending", tag) for tag in self.extra_tags if tag not in queried)
+        return jobs
+
+    def _fetch_by_hashtags(self):
+        for batch in self.http.fan_out_iter(self._fetch_hashtag, self._hashtag_jobs(), cancel=self.cancel_event):
+            yield from batch
+
+    def _fetch_hashtag(self, job: tuple) -> list:
+        try:
+            return self._hashtag(job)
+        except Exception:
+            return []
+
+    def _hashtag(self, job: tuple) -> list:
+        cat, tag = job
+        url   = f"https://www.tiktok.com/api/search/item/full/?keyword=%23{tag}&count=10&cursor=0&aid=1988&region={self.region}"
+        resp  = require_ok(self.http.get(url, headers=self.headers, timeout=10, endpoint="hashtag", cancel=self.cancel_event))
+        data  = resp.json()
+        posts = data.get("item_list", data.get("itemList", []))
+        items = []
+        for post in posts[:self.settings.get("posts_per_tag", 5)]:
+            item = self._parse_post(post, category=cat)
+            if item:
+                items.append(item)
         return items
 
+    def _cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
     def _fetch_fallback(self) -> list:
         try:
-            resp = requests.get("https://www.tiktok.com/trending", headers=HEADERS, timeout=15)
+            url  = f"https://www.tiktok.com/trending?lang={self.locale}&region={self.region}"
+            resp = self.http.get(url, headers=self.headers, timeout=15, endpoint="page", cancel=self.cancel_event)
             if resp.status_code != 200:
                 return []
-            pattern = r'"desc":"([^"]{10,200})".*?"playCount":(\d+).*?"diggCount":(\d+).*?"commentCount":(\d+)'
-            matches = re.findall(pattern, resp.text)
-            items   = []
-            for i, (desc, plays, likes, comments) in enumerate(matches[:self.max_items]):
-                uid = hashlib.md5(desc.encode()).hexdigest()[:12]
-                items.append(TrendItem(
-                    id=self._make_id(uid),
-                    source="tiktok",
-                    title=desc,
-                    description=desc,
-                    url=f"https://www.tiktok.com/trending",
-                    views=int(plays),
-                    likes=int(likes),
-                    comments=int(comments),
-                    category="trending",
-                    language="en",
-                ))
+            data = hydration_data(resp.text)
+            if data is None:
+                return []
+            items = []
+            for post in iter_objects(data, ("desc", "stats")):
+                if isinstance(post.get("author"), str):
+                    post = {**post, "author": {"uniqueId": post["author"]}}
+                item = self._parse_post(post)
+                if item:
+                    items.append(item)
+                    if len(items) >= self.max_items:
+                        break
             return items
         except Exception:
             return self._generate_mock()
 
+    @metrics.timed("parse", source="tiktok", kind="post")
     def _parse_post(self, post: dict, category: str = "trending") -> TrendItem:
         try:
             video   = post.get("video", {})
@@ -133,7 +187,8 @@ class TikTokScraper(BaseScraper):
                 comments=int(stats.get("commentCount", 0)),
                 shares=int(stats.get("shareCount", 0)),
                 category=category,
-                language="en",
+                region=self.region,
+                language=self.locale.split("-")[0],
             )
         except Exception:
             return None
@@ -164,6 +219,7 @@ class TikTokScraper(BaseScraper):
                 comments=d["comments"],
                 shares=d["shares"],
                 category=d["cat"],
+                region=self.region,
                 language="en",
             ))
         return items
@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import gzip
+from contextlib import contextmanager
+from .config import Config
+from .data import AggregatedResults
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
+@contextmanager
+def open_output(path: str, compression: str = None):
+    compression = compression or EXTENSIONS.get(os.path.splitext(path)[1], "none")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd output needs the zstandard package (pip install socialradar[zstd])")
+    if compression not in ("none", "gzip", "zstd"):
+        raise ValueError(f"unknown compression {compression!r}")
+
+    stdout = path == "-"
+    tmp    = None if stdout else f"{path}.{os.getpid()}.tmp"
+    if tmp and os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    raw    = sys.stdout.buffer if stdout else open(tmp, "wb")
+    stream = raw
+    if compression == "gzip":
+        stream = gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=6)
+    elif compression == "zstd":
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+    try:
+        yield stream
+        if stream is not raw:
+            stream.close()
+        raw.flush()
+    except BaseException:
+        if not stdout:
+            raw.close()
+            os.remove(tmp)
+        raise
+    if not stdout:
+        raw.close()
+        os.replace(tmp, path)
+
+
+class NDJSONWriter:
+    def __init__(self, stream, buffer_bytes: int = 1 << 16):
+        self.stream       = stream
+        self.buffer_bytes = buffer_bytes
+        self.count        = 0
+        self._chunks = []
+        self._size   = 0
+
+    def write(self, item):
+        line = item.to_json()
+        self._chunks.append(line)
+        self._chunks.append(b"\n")
+        self._size  += len(line) + 1
+        self.count  += 1
+        if self._size >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            self.stream.write(b"".join(self._chunks))
+            self._chunks = []
+            self._size   = 0
+
+    def close(self):
+        self.flush()
+
+
+class JSONWriter(NDJSONWriter):
+    def __init__(self, stream, header: dict, buffer_bytes: int = 1 << 16):
+        super().__init__(stream, buffer_bytes)
+        stream.write(json.dumps(header, default=str)[:-1].encode() + b',"items":[')
+
+    def write(self, item):
+        if self.count:
+            self._chunks.append(b",")
+            self._size += 1
+        line = item.to_json()
+        self._chunks.append(line)
+        self._size += len(line)
+        self.count += 1
+        if self._size >= self.buffer_bytes:
+            self.flush()
+
+    def close(self):
+        self._chunks.append(b"]}\n")
+        self.flush()
+
+
+def write_results(results: AggregatedResults, path: str, fmt: str = "ndjson", compression: str = None) -> int:
+    with open_output(path, compression) as stream:
+        if fmt == "json":
+            header = {
+                "fetched_at": results.fetched_at.isoformat(),
+                "total":      results.total(),
+                "errors":     results.errors,
+                "meta":       results.meta,
+            }
+            writer = JSONWriter(stream, header)
+        elif fmt == "ndjson":
+            writer = NDJSONWriter(stream)
+        else:
+            raise ValueError(f"unknown stream format {fmt!r}")
+        for item in results.ranked():
+            writer.write(item)
+        writer.close()
+    return writer.count
+
+
+def write_from_config(results: AggregatedResults, config: Config):
+    template = config.get("report.stream.path")
+    if not template:
+        return None
+    if config.get("report.delta_only", False):
+        results = results.delta_only()
+    path  = template.format(fetched_at=results.fetched_at)
+    count = write_results(
+        results,
+        path,
+        fmt=config.get("report.stream.format", "ndjson"),
+        compression=config.get("report.stream.compression") or None,
+    )
+    if path != "-":
+        print(f"  Streamed {count} items to {path}")
+    return path